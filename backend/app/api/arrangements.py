@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.stats import StatsSpec, Count
 from app.models.arrangement import Arrangement
 from app.models.case import Case
 from app.schemas.arrangement import ArrangementCreate, ArrangementUpdate, ArrangementResponse
@@ -29,11 +32,11 @@ def create_arrangement(arrangement: ArrangementCreate, db: Session = Depends(get
 @router.get("/", response_model=List[dict])
 @router.get("", response_model=List[dict])
 def get_arrangements(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
     approval_status: Optional[str] = Query(None),
     is_confirmed: Optional[bool] = Query(None),
+    render: Renderer = Depends(),
     db: Session = Depends(get_db)
 ):
     """Get all arrangements with optional filters"""
@@ -53,7 +56,7 @@ def get_arrangements(
     if is_confirmed is not None:
         query = query.filter(Arrangement.is_confirmed == is_confirmed)
 
-    arrangements = query.order_by(Arrangement.created_at.desc()).offset(skip).limit(limit).all()
+    arrangements = page.paginate(query, Arrangement.created_at.desc())
 
     result = []
     for arrangement in arrangements:
@@ -82,23 +85,22 @@ def get_arrangements(
             "updated_at": arrangement.updated_at,
         })
 
-    return result
+    return render.data(result)
+
+
+arrangement_stats = StatsSpec(
+    Arrangement,
+    total=Count(),
+    pending_approval=Count(Arrangement.approval_status == "Pending Approval"),
+    approved=Count(Arrangement.approval_status == "Approved"),
+    confirmed=Count(Arrangement.is_confirmed == True),
+)
 
 
 @router.get("/stats", response_model=dict)
 def get_arrangement_stats(db: Session = Depends(get_db)):
     """Get arrangement statistics"""
-    total = db.query(Arrangement).count()
-    pending = db.query(Arrangement).filter(Arrangement.approval_status == "Pending Approval").count()
-    approved = db.query(Arrangement).filter(Arrangement.approval_status == "Approved").count()
-    confirmed = db.query(Arrangement).filter(Arrangement.is_confirmed == True).count()
-
-    return {
-        "total": total,
-        "pending_approval": pending,
-        "approved": approved,
-        "confirmed": confirmed,
-    }
+    return arrangement_stats.compute(db)
 
 
 @router.get("/{arrangement_id}", response_model=ArrangementResponse)
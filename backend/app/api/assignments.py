@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
 from app.models.assignment import Assignment
 from app.schemas.assignment import AssignmentCreate, AssignmentUpdate, AssignmentResponse
 
@@ -22,9 +23,9 @@ def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db
 
 @router.get("/", response_model=List[AssignmentResponse])
 @router.get("", response_model=List[AssignmentResponse])
-def get_assignments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_assignments(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all assignments"""
-    assignments = db.query(Assignment).order_by(Assignment.assigned_date.desc()).offset(skip).limit(limit).all()
+    assignments = page.paginate(db.query(Assignment), Assignment.assigned_date.desc())
     return assignments
 
 
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
 from app.models.case_note import CaseNote
 from app.schemas.case_note import CaseNoteCreate, CaseNoteUpdate, CaseNoteResponse
 
@@ -22,9 +23,9 @@ def create_case_note(note: CaseNoteCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[CaseNoteResponse])
 @router.get("", response_model=List[CaseNoteResponse])
-def get_case_notes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_case_notes(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all case notes"""
-    notes = db.query(CaseNote).order_by(CaseNote.created_at.desc()).offset(skip).limit(limit).all()
+    notes = page.paginate(db.query(CaseNote), CaseNote.created_at.desc())
     return notes
 
 
@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-
-from app.core.database import get_db
+from typing import List, Optional
+from pathlib import Path
+import mimetypes
+from app.core import thumbnails
+from app.core.archive import safe_name, zip_response
+from app.core.blobs import document_file
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_async_db, get_async_primary_db, AsyncDB
+from app.core.entity_cache import entity_cache
+from app.core.fieldsets import Fieldset
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.sequences import next_number
+from app.core.search import apply_search
+from app.core.storage import INCOMING_DIR, file_response, get_storage
+from app.core.uploads import ReceivedFile, receive_file, MULTIPART_FILE_BODY
 from app.models.case import Case
+from app.models.document import Document
 from app.schemas.case import CaseCreate, CaseUpdate, CaseResponse
 
 router = APIRouter()
 
 
-def generate_case_number():
+def generate_case_number(db: Session):
     """Generate a unique case number in format FD-YYYY-XXXX"""
-    year = datetime.now().year
-    return f"FD-{year}-{datetime.now().strftime('%m%d%H%M%S')}"
+    return next_number(db, "cases")
 
 
 @router.post("/", response_model=CaseResponse)
@@ -21,7 +34,7 @@ def generate_case_number():
 def create_case(case: CaseCreate, db: Session = Depends(get_db)):
     """Create a new case"""
     db_case = Case(
-        case_number=generate_case_number(),
+        case_number=generate_case_number(db),
         **case.model_dump()
     )
     db.add(db_case)
@@ -30,23 +43,164 @@ def create_case(case: CaseCreate, db: Session = Depends(get_db)):
     return db_case
 
 
+def _case_query(db: Session, search: Optional[str]):
+    query = db.query(Case)
+
+    if search:
+        query = apply_search(query, Case, search)
+
+    return query
+
+
 @router.get("/", response_model=List[CaseResponse])
 @router.get("", response_model=List[CaseResponse])
-def get_cases(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_cases(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    fields: Fieldset = Depends(),
+    render: Renderer = Depends(),
+    db: AsyncDB = Depends(get_async_db)
+):
     """Get all cases"""
-    cases = db.query(Case).order_by(Case.created_at.desc()).offset(skip).limit(limit).all()
-    return cases
+    return await db.run(lambda session: render.rows(
+        page.paginate(fields.select(_case_query(session, search), CaseResponse), Case.created_at.desc()),
+        CaseResponse, fields.names
+    ))
 
 
 @router.get("/{case_id}", response_model=CaseResponse)
-def get_case(case_id: int, db: Session = Depends(get_db)):
+async def get_case(case_id: int, conditional: Conditional = Depends(), db: AsyncDB = Depends(get_async_primary_db)):
     """Get a specific case by ID"""
+    case = entity_cache.get(Case, case_id)
+    if case is None:
+        case = await db.run(entity_cache.load, Case, case_id, CaseResponse)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    conditional.check(case.updated_at or case.created_at)
+    return case
+
+
+@router.get("/{case_id}/documents.zip")
+def download_case_documents(case_id: int, db: Session = Depends(get_db)):
+    """Download every document of a case as one ZIP, one folder per document type"""
     case = db.query(Case).filter(Case.id == case_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
+
+    documents = db.query(Document).filter(
+        Document.case_id == case_id,
+        Document.is_deleted == False
+    ).order_by(Document.document_type, Document.created_at).all()
+
+    members = []
+    for document in documents:
+        storage, key = document_file(document)
+        members.append((
+            f"{safe_name(document.document_type, 'Other')}/{safe_name(document.file_name, f'document-{document.id}')}",
+            document.created_at,
+            document.file_size or 0,
+            lambda storage=storage, key=key: storage.open(key),
+        ))
+    return zip_response(members, f"{case.case_number}-documents.zip")
+
+
+PHOTO_MAX_SIZE = 20 * 1024 * 1024
+
+
+def _check_photo(filename: str, content_type: Optional[str] = None):
+    if thumbnails.kind_of(Path(filename).suffix.lstrip(".")) != "image":
+        raise HTTPException(
+            status_code=400,
+            detail=f"Case photos must be one of: {', '.join(sorted(thumbnails.IMAGE_TYPES)).lower()}"
+        )
+
+
+def _delete_photo(key: str):
+    storage = get_storage()
+    storage.delete(key)
+    for variant in thumbnails.VARIANTS:
+        storage.delete(thumbnails.variant_key(key, variant))
+
+
+def _set_photo(db: Session, case_id: int, key: Optional[str] = None):
+    """Point the case at the photo ``key``; returns (case, key of the photo it replaced)"""
+    db_case = db.query(Case).filter(Case.id == case_id).first()
+    if not db_case:
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    previous = db_case.photo_key
+    if key is not None:
+        db_case.photo_key = key
+        db_case.photo_url = f"/api/cases/{case_id}/photo"
+        db_case.has_thumbnail = None
+        db.commit()
+        db.refresh(db_case)
+    return db_case, previous
+
+
+async def _store_photo(db: AsyncDB, case_id: int, received: ReceivedFile) -> Case:
+    _, previous = await db.run(_set_photo, case_id)
+    key = f"photos/cases/{case_id}/{received.sha256}{Path(received.filename).suffix.lower()}"
+    # Storage I/O runs on the threadpool, not inside the session's greenlet
+    await run_in_threadpool(get_storage().put_file, key, received.path)
+    try:
+        db_case, previous = await db.run(_set_photo, case_id, key)
+    except Exception:
+        await db.run(Session.rollback)
+        if key != previous:
+            await run_in_threadpool(_delete_photo, key)
+        raise
+
+    if previous and previous != key:
+        await run_in_threadpool(_delete_photo, previous)
+    return db_case
+
+
+@router.post("/{case_id}/photo", response_model=CaseResponse, openapi_extra=MULTIPART_FILE_BODY)
+async def upload_case_photo(case_id: int, request: Request, db: AsyncDB = Depends(get_async_db)):
+    """Upload the photo of the deceased; thumbnails are rendered in the background"""
+    received = await receive_file(request, INCOMING_DIR, max_size=PHOTO_MAX_SIZE, check=_check_photo)
+    try:
+        case = await _store_photo(db, case_id, received)
+    finally:
+        # No-op once the file has been handed to storage
+        received.discard()
+    thumbnails.schedule(case.photo_key, Path(case.photo_key).suffix.lstrip("."), Case, Case.id == case.id)
     return case
 
 
+def _get_case_with_photo(db: Session, case_id: int) -> Case:
+    db_case = db.query(Case).filter(Case.id == case_id).first()
+    if not db_case or not db_case.photo_key:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return db_case
+
+
+@router.api_route("/{case_id}/photo", methods=["GET", "HEAD"])
+def get_case_photo(case_id: int, request: Request, db: Session = Depends(get_db)):
+    """The uploaded photo of the deceased"""
+    db_case = _get_case_with_photo(db, case_id)
+    key = db_case.photo_key
+    filename = f"{db_case.case_number}-photo{Path(key).suffix}"
+    return file_response(request, key, filename, mimetypes.guess_type(key)[0], etag=Path(key).stem, inline=True)
+
+
+@router.get("/{case_id}/photo/thumbnail")
+def get_case_photo_thumbnail(
+    case_id: int,
+    request: Request,
+    variant: str = Query("thumb", pattern=f"^({'|'.join(thumbnails.VARIANTS)})$"),
+    db: Session = Depends(get_db)
+):
+    """Small JPEG rendering of the case photo for cards and lists"""
+    db_case = _get_case_with_photo(db, case_id)
+    if not db_case.has_thumbnail:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    key = thumbnails.variant_key(db_case.photo_key, variant)
+    filename = f"{db_case.case_number}-{variant}.jpg"
+    return file_response(request, key, filename, "image/jpeg", etag=f"{Path(db_case.photo_key).stem}-{variant}", inline=True)
+
+
 @router.put("/{case_id}", response_model=CaseResponse)
 def update_case(case_id: int, case_update: CaseUpdate, db: Session = Depends(get_db)):
     """Update a case"""
@@ -72,4 +226,6 @@ def delete_case(case_id: int, db: Session = Depends(get_db)):
 
     db.delete(db_case)
     db.commit()
+    if db_case.photo_key:
+        _delete_photo(db_case.photo_key)
     return {"message": "Case deleted successfully", "case_number": db_case.case_number}
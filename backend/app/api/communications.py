@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from ..models.communication import Communication
 from ..schemas.communication import CommunicationCreate, CommunicationUpdate, CommunicationResponse
 from ..core.database import get_db
+from ..core.pagination import Pagination
+from ..core.stats import StatsSpec, Count
 
 router = APIRouter()
 
@@ -18,8 +19,7 @@ def create_communication(communication: CommunicationCreate, db: Session = Depen
 
 @router.get("/", response_model=List[CommunicationResponse])
 def get_communications(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     type: Optional[str] = None,
     status: Optional[str] = None,
@@ -40,31 +40,20 @@ def get_communications(
     if status:
         query = query.filter(Communication.status == status)
 
-    communications = query.order_by(Communication.communication_date.desc()).offset(skip).limit(limit).all()
+    communications = page.paginate(query, Communication.communication_date.desc())
     return communications
 
+communication_stats = StatsSpec(
+    Communication,
+    total=Count(),
+    sent=Count(Communication.status == "Sent"),
+    delivered=Count(Communication.status == "Delivered"),
+    failed=Count(Communication.status == "Failed"),
+)
+
 @router.get("/stats")
 def get_communication_stats(db: Session = Depends(get_db)):
-    total = db.query(func.count(Communication.id)).scalar()
-
-    sent = db.query(func.count(Communication.id)).filter(
-        Communication.status == "Sent"
-    ).scalar()
-
-    delivered = db.query(func.count(Communication.id)).filter(
-        Communication.status == "Delivered"
-    ).scalar()
-
-    failed = db.query(func.count(Communication.id)).filter(
-        Communication.status == "Failed"
-    ).scalar()
-
-    return {
-        "total": total,
-        "sent": sent,
-        "delivered": delivered,
-        "failed": failed
-    }
+    return communication_stats.compute(db)
 
 @router.get("/{communication_id}", response_model=CommunicationResponse)
 def get_communication(communication_id: int, db: Session = Depends(get_db)):
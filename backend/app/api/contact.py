@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from ..core.database import get_db
+from ..core.pagination import Pagination
 from ..models.contact import Contact
 from ..schemas.contact import ContactCreate, ContactResponse
 
@@ -19,9 +20,9 @@ def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[ContactResponse])
-def get_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_contacts(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all contact submissions"""
-    contacts = db.query(Contact).offset(skip).limit(limit).all()
+    contacts = page.paginate(db.query(Contact))
     return contacts
 
 
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.stats import StatsSpec, Count
 from app.models.document_template import DocumentTemplate
 from app.models.document_type import DocumentType
 from app.schemas.document_template import (
@@ -14,32 +16,23 @@ from app.schemas.document_template import (
 
 router = APIRouter(prefix="/api/document-templates", tags=["document-templates"])
 
+document_template_stats = StatsSpec(
+    DocumentTemplate,
+    DocumentTemplate.is_deleted == False,
+    total_templates=Count(),
+    active_templates=Count(DocumentTemplate.status == "Active"),
+    word_templates=Count(DocumentTemplate.template_type == "Word"),
+    pdf_templates=Count(DocumentTemplate.template_type == "PDF"),
+)
+
 @router.get("/stats", response_model=DocumentTemplateStats)
 def get_document_template_stats(db: Session = Depends(get_db)):
     """Get document template statistics"""
-    total_templates = db.query(DocumentTemplate).filter(DocumentTemplate.is_deleted == False).count()
-    active_templates = db.query(DocumentTemplate).filter(
-        DocumentTemplate.is_deleted == False,
-        DocumentTemplate.status == "Active"
-    ).count()
-    word_templates = db.query(DocumentTemplate).filter(
-        DocumentTemplate.is_deleted == False,
-        DocumentTemplate.template_type == "Word"
-    ).count()
-    pdf_templates = db.query(DocumentTemplate).filter(
-        DocumentTemplate.is_deleted == False,
-        DocumentTemplate.template_type == "PDF"
-    ).count()
-
-    return {
-        "total_templates": total_templates,
-        "active_templates": active_templates,
-        "word_templates": word_templates,
-        "pdf_templates": pdf_templates
-    }
+    return document_template_stats.compute(db)
 
 @router.get("/", response_model=List[DocumentTemplateResponse])
 def get_document_templates(
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     template_type: Optional[str] = None,
     status: Optional[str] = None,
@@ -57,16 +50,17 @@ def get_document_templates(
     if status and status != "All Statuses":
         query = query.filter(DocumentTemplate.status == status)
 
-    templates = query.order_by(DocumentTemplate.created_at.desc()).all()
+    templates = page.paginate(query, DocumentTemplate.created_at.desc())
+
+    # Get document type names for the whole page in one query
+    type_ids = {template.document_type_id for template in templates if template.document_type_id}
+    doc_type_names = dict(
+        db.query(DocumentType.id, DocumentType.name).filter(DocumentType.id.in_(type_ids)).all()
+    ) if type_ids else {}
 
-    # Get document type names
     result = []
     for template in templates:
-        doc_type_name = None
-        if template.document_type_id:
-            doc_type = db.query(DocumentType).filter(DocumentType.id == template.document_type_id).first()
-            if doc_type:
-                doc_type_name = doc_type.name
+        doc_type_name = doc_type_names.get(template.document_type_id)
 
         template_dict = {
             "id": template.id,
@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_db
+from app.core.pagination import Pagination
+from app.core.reference_data import ReferenceData
+from app.core.stats import StatsSpec, Count
 from app.models.document_type import DocumentType
 from app.models.document import Document
 from app.schemas.document_type import (
@@ -14,32 +17,23 @@ from app.schemas.document_type import (
 
 router = APIRouter(prefix="/api/document-types", tags=["document-types"])
 
+document_type_stats = StatsSpec(
+    DocumentType,
+    DocumentType.is_deleted == False,
+    total_types=Count(),
+    active_types=Count(DocumentType.status == "Active"),
+    require_signature=Count(DocumentType.require_signature == True),
+    require_approval=Count(DocumentType.require_approval == True),
+)
+
 @router.get("/stats", response_model=DocumentTypeStats)
 def get_document_type_stats(db: Session = Depends(get_db)):
     """Get document type statistics"""
-    total_types = db.query(DocumentType).filter(DocumentType.is_deleted == False).count()
-    active_types = db.query(DocumentType).filter(
-        DocumentType.is_deleted == False,
-        DocumentType.status == "Active"
-    ).count()
-    require_signature = db.query(DocumentType).filter(
-        DocumentType.is_deleted == False,
-        DocumentType.require_signature == True
-    ).count()
-    require_approval = db.query(DocumentType).filter(
-        DocumentType.is_deleted == False,
-        DocumentType.require_approval == True
-    ).count()
-
-    return {
-        "total_types": total_types,
-        "active_types": active_types,
-        "require_signature": require_signature,
-        "require_approval": require_approval
-    }
+    return document_type_stats.compute(db)
 
 @router.get("/", response_model=List[DocumentTypeResponse])
 def get_document_types(
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     category: Optional[str] = None,
     status: Optional[str] = None,
@@ -57,15 +51,19 @@ def get_document_types(
     if status and status != "All Statuses":
         query = query.filter(DocumentType.status == status)
 
-    document_types = query.order_by(DocumentType.created_at.desc()).all()
+    document_types = page.paginate(query, DocumentType.created_at.desc())
+
+    # Get document counts for the whole page in one query
+    doc_counts = dict(
+        db.query(Document.document_type, func.count(Document.id)).filter(
+            Document.document_type.in_([doc_type.name for doc_type in document_types]),
+            Document.is_deleted == False
+        ).group_by(Document.document_type).all()
+    )
 
-    # Get document count for each type
     result = []
     for doc_type in document_types:
-        doc_count = db.query(Document).filter(
-            Document.document_type == doc_type.name,
-            Document.is_deleted == False
-        ).count()
+        doc_count = doc_counts.get(doc_type.name, 0)
 
         doc_type_dict = {
             "id": doc_type.id,
@@ -86,13 +84,17 @@ def get_document_types(
 
     return result
 
+document_type_categories = ReferenceData(
+    "document_types.categories",
+    DocumentType.category,
+    DocumentType.is_deleted == False,
+)
+
+
 @router.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_primary_db)):
     """Get all unique categories"""
-    categories = db.query(DocumentType.category).filter(
-        DocumentType.is_deleted == False
-    ).distinct().all()
-    return [cat[0] for cat in categories]
+    return document_type_categories.values(db)
 
 @router.post("/", response_model=DocumentTypeResponse)
 def create_document_type(
@@ -1,25 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, or_
+from sqlalchemy import desc, func
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 import os
-import shutil
 from pathlib import Path
-
-from app.core.database import get_db
+from uuid import uuid4
+
+from app.core import fulltext, thumbnails, versions
+from app.core.blobs import blob_key, document_file, place
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_primary_db, get_async_db, get_async_primary_db, AsyncDB
+from app.core.entity_cache import entity_cache
+from app.core.pagination import Pagination
+from app.core.reference_data import ReferenceData
+from app.core.rendering import Renderer
+from app.core.resumable import UPLOAD_LENGTH, UPLOAD_OFFSET, advance, append, session_path
+from app.core.search import apply_search
+from app.core.stats import StatsSpec, Count, Sum
+from app.core.storage import INCOMING_DIR, file_response
+from app.core.uploads import ReceivedFile, receive_file, sha256_file, MULTIPART_FILE_BODY
+from app.models.blob import Blob
 from app.models.document import Document
+from app.models.document_type import DocumentType
+from app.models.document_version import DocumentVersion
+from app.models.upload_session import UploadSession
 from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse
+from app.schemas.document_version import DocumentVersionResponse
+from app.schemas.upload_session import UploadSessionCreate, UploadSessionResponse
 
 router = APIRouter()
 
-# Configure upload directory
-UPLOAD_DIR = Path("uploads/documents")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+def _upload_rules(db: Session, document_type: str):
+    """(max size in bytes, allowed extensions) configured on the document type"""
+    doc_type = db.query(DocumentType).filter(
+        DocumentType.name == document_type,
+        DocumentType.is_deleted == False
+    ).first()
+    if not doc_type:
+        return None, set()
+
+    max_size = doc_type.max_size_mb * 1024 * 1024 if doc_type.max_size_mb else None
+    extensions = {
+        extension.strip().lstrip(".").lower()
+        for extension in (doc_type.allowed_extensions or "").split(",")
+        if extension.strip()
+    }
+    return max_size, extensions
+
+
+def _extension_check(document_type: str, extensions: set):
+    """receive_file check rejecting files whose extension the document type does not allow"""
+    def check(filename: str, content_type: Optional[str] = None):
+        extension = os.path.splitext(filename)[1].lstrip(".").lower()
+        if extensions and extension not in extensions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{document_type} documents must be one of: {', '.join(sorted(extensions))}"
+            )
+    return check
+
+
+def _add_document(db: Session, document: Document, upload_token: Optional[str] = None):
+    document.current_version = 1
+    db.add(document)
+    # Flushing takes the blob row lock before the file is moved into place
+    db.flush()
+    db.add(versions.first_version(document))
+    if upload_token:
+        db.query(UploadSession).filter(UploadSession.token == upload_token).update(
+            {"document_id": document.id}, synchronize_session=False
+        )
+    db.flush()
+
+
+async def _store_document(db: AsyncDB, document: Document, received: ReceivedFile,
+                          upload_token: Optional[str] = None) -> Document:
+    try:
+        await db.run(_add_document, document, upload_token)
+        # Storage I/O stays off the event loop; the transaction, and with it
+        # the blob row lock, stays open until the commit below
+        await run_in_threadpool(place, received)
+        await db.run(Session.commit)
+    except Exception:
+        await db.run(Session.rollback)
+        received.discard()
+        raise
+    await db.run(Session.refresh, document)
+    return document
 
 
-@router.post("/upload")
+def _schedule_processing(document: Document):
+    """Render thumbnails and extract the text of a stored document in the background"""
+    key = blob_key(document.content_hash)
+    thumbnails.schedule(key, document.file_type, Document, Document.content_hash == document.content_hash)
+    fulltext.schedule(key, document.file_type, document.content_hash)
+
+
+@router.post("/upload", response_model=DocumentResponse, openapi_extra=MULTIPART_FILE_BODY)
 async def upload_document(
-    file: UploadFile = File(...),
+    request: Request,
     title: str = Query(...),
     document_type: str = Query(...),
     description: Optional[str] = Query(None),
@@ -29,73 +111,188 @@ async def upload_document(
     visibility: str = Query("Private"),
     tags: Optional[str] = Query(None),
     uploaded_by: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncDB = Depends(get_async_db)
 ):
-    """Upload a new document"""
+    """Upload a new document, enforcing the size and extension limits of its type"""
+    max_size, extensions = await db.run(_upload_rules, document_type)
+    check = _extension_check(document_type, extensions)
+    received = await receive_file(request, INCOMING_DIR, max_size=max_size, check=check)
+    document = Document(
+        title=title,
+        description=description,
+        document_type=document_type,
+        file_name=received.filename,
+        file_path=blob_key(received.sha256),
+        file_size=received.size,
+        file_type=os.path.splitext(received.filename)[1].lstrip('.').upper(),
+        mime_type=received.content_type,
+        content_hash=received.sha256,
+        case_id=case_id,
+        client_name=client_name,
+        status=status,
+        visibility=visibility,
+        tags=tags,
+        uploaded_by=uploaded_by
+    )
     try:
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{title.replace(' ', '_')}_{func.now()}_{file.filename}"
-        file_path = UPLOAD_DIR / unique_filename
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Get file size
-        file_size = os.path.getsize(file_path)
-
-        # Create document record
-        document = Document(
-            title=title,
-            description=description,
-            document_type=document_type,
-            file_name=file.filename,
-            file_path=str(file_path),
-            file_size=file_size,
-            file_type=file_extension.lstrip('.').upper(),
-            mime_type=file.content_type,
-            case_id=case_id,
-            client_name=client_name,
-            status=status,
-            visibility=visibility,
-            tags=tags,
-            uploaded_by=uploaded_by
+        document = await _store_document(db, document, received)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    _schedule_processing(document)
+    return document
+
+
+def _get_upload_session(db: Session, token: str) -> UploadSession:
+    # populate_existing: advance() updates the offset in bulk, and async
+    # sessions keep loaded objects across commits
+    session = db.query(UploadSession).filter(UploadSession.token == token).populate_existing().first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+def _upload_headers(session: UploadSession) -> dict:
+    return {
+        UPLOAD_OFFSET: str(session.upload_offset),
+        UPLOAD_LENGTH: str(session.file_size),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    request: Request,
+    response: Response,
+    db: AsyncDB = Depends(get_async_db)
+):
+    """Start a resumable upload; send the file with PATCH /uploads/{token}"""
+    max_size, extensions = await db.run(_upload_rules, upload.document_type)
+    _extension_check(upload.document_type, extensions)(upload.file_name)
+    if max_size is not None and upload.file_size > max_size:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_size / (1024 * 1024):g} MB limit")
+
+    session = UploadSession(
+        token=uuid4().hex,
+        file_name=Path(upload.file_name).name,
+        mime_type=upload.mime_type,
+        file_size=upload.file_size,
+        upload_offset=0,
+        document_fields=upload.model_dump(exclude={"file_name", "file_size", "mime_type"}),
+    )
+    session = await db.run(_save_upload_session, session)
+    response.headers.update(_upload_headers(session))
+    response.headers["Location"] = str(request.url_for("append_upload", token=session.token))
+    return session
+
+
+def _save_upload_session(db: Session, session: UploadSession) -> UploadSession:
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+@router.api_route("/uploads/{token}", methods=["GET", "HEAD"], response_model=UploadSessionResponse)
+async def get_upload_session(token: str, response: Response, db: AsyncDB = Depends(get_async_primary_db)):
+    """Offset to resume a resumable upload from (Upload-Offset header and body)"""
+    # Read from the primary: a lagging replica would report an offset the
+    # next PATCH's compare-and-set then rejects
+    session = await db.run(_get_upload_session, token)
+    response.headers.update(_upload_headers(session))
+    return session
+
+
+@router.patch("/uploads/{token}", response_model=UploadSessionResponse)
+async def append_upload(
+    token: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias=UPLOAD_OFFSET),
+    db: AsyncDB = Depends(get_async_db)
+):
+    """Append bytes at Upload-Offset; the document is created when the last byte arrives"""
+    session = await db.run(_get_upload_session, token)
+    if session.document_id or upload_offset != session.upload_offset:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload is at offset {session.upload_offset}, not {upload_offset}",
+            headers=_upload_headers(session),
         )
 
-        db.add(document)
-        db.commit()
-        db.refresh(document)
+    offset = await append(request, token, upload_offset, session.file_size)
+    if not await db.run(advance, token, upload_offset, offset):
+        session = await db.run(_get_upload_session, token)
+        raise HTTPException(
+            status_code=409,
+            detail="Another request wrote to this upload first",
+            headers=_upload_headers(session),
+        )
 
-        return document
+    if offset == session.file_size:
+        await _complete_upload(db, session)
+    session = await db.run(_get_upload_session, token)
+    response.headers.update(_upload_headers(session))
+    return session
+
+
+async def _complete_upload(db: AsyncDB, session: UploadSession):
+    path = session_path(session.token)
+    sha256 = await run_in_threadpool(sha256_file, path)
+    received = ReceivedFile(session.file_name, session.mime_type, path, session.file_size, sha256)
+    document = Document(
+        **session.document_fields,
+        file_name=session.file_name,
+        file_path=blob_key(sha256),
+        file_size=session.file_size,
+        file_type=os.path.splitext(session.file_name)[1].lstrip('.').upper(),
+        mime_type=session.mime_type,
+        content_hash=sha256,
+    )
+    try:
+        document = await _store_document(db, document, received, session.token)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    _schedule_processing(document)
+
+
+@router.delete("/uploads/{token}", status_code=204)
+async def cancel_upload(token: str, db: AsyncDB = Depends(get_async_db)):
+    """Abandon a resumable upload and discard the bytes received so far"""
+    await db.run(_delete_upload_session, token)
+    session_path(token).unlink(missing_ok=True)
+
+
+def _delete_upload_session(db: Session, token: str):
+    db.delete(_get_upload_session(db, token))
+    db.commit()
 
 
 @router.get("/", response_model=List[DocumentResponse])
 @router.get("", response_model=List[DocumentResponse])
 def get_documents(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
+    content_search: Optional[str] = Query(None, description="Words to find in the documents' contents"),
     document_type: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     visibility: Optional[str] = Query(None),
+    render: Renderer = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Get all documents with optional filters"""
+    """Get all documents with optional filters.
+
+    ``content_search`` matches the text extracted from the files and ranks the
+    best hits first; each hit carries a ``snippet`` of the matching passage.
+    """
     query = db.query(Document).filter(Document.is_deleted == False)
 
     # Apply filters
     if search:
-        query = query.filter(
-            or_(
-                Document.title.ilike(f"%{search}%"),
-                Document.description.ilike(f"%{search}%"),
-                Document.tags.ilike(f"%{search}%"),
-                Document.client_name.ilike(f"%{search}%")
-            )
-        )
+        query = apply_search(query, Document, search)
+
+    if content_search:
+        query = fulltext.apply_content_search(query, Document, content_search)
 
     if document_type and document_type != "All Types":
         query = query.filter(Document.document_type == document_type)
@@ -106,56 +303,55 @@ def get_documents(
     if visibility and visibility != "All":
         query = query.filter(Document.visibility == visibility)
 
-    documents = query.order_by(desc(Document.created_at)).offset(skip).limit(limit).all()
-    return documents
+    documents = page.paginate(query, desc(Document.created_at))
+    if content_search:
+        passages = fulltext.snippets(db, content_search, [d.content_hash for d in documents])
+        for document in documents:
+            document.snippet = passages.get(document.content_hash)
+    return render.rows(documents, DocumentResponse)
+
+
+document_stats = StatsSpec(
+    Document,
+    Document.is_deleted == False,
+    total=Count(),
+    draft=Count(Document.status == "Draft"),
+    approved=Count(Document.status == "Approved"),
+    total_storage_mb=Sum(Document.file_size, scale=1 / (1024 * 1024), ndigits=2),
+)
+
+# Bytes actually on disk, with duplicate uploads counted once
+blob_stats = StatsSpec(
+    Blob,
+    Blob.ref_count > 0,
+    physical_storage_mb=Sum(Blob.size, scale=1 / (1024 * 1024), ndigits=2),
+)
 
 
 @router.get("/stats", response_model=dict)
 def get_document_stats(db: Session = Depends(get_db)):
     """Get document statistics"""
-    total = db.query(Document).filter(Document.is_deleted == False).count()
-    draft = db.query(Document).filter(
-        Document.status == "Draft",
-        Document.is_deleted == False
-    ).count()
-    approved = db.query(Document).filter(
-        Document.status == "Approved",
-        Document.is_deleted == False
-    ).count()
+    return {**document_stats.compute(db), **blob_stats.compute(db)}
 
-    # Calculate total storage (in MB)
-    total_size_query = db.query(func.sum(Document.file_size)).filter(
-        Document.is_deleted == False
-    ).scalar()
-    total_storage_mb = (total_size_query or 0) / (1024 * 1024)
 
-    return {
-        "total": total,
-        "draft": draft,
-        "approved": approved,
-        "total_storage_mb": round(total_storage_mb, 2),
-    }
+document_types = ReferenceData("documents.document_types", Document.document_type, Document.is_deleted == False)
 
 
 @router.get("/types", response_model=List[str])
-def get_document_types(db: Session = Depends(get_db)):
+def get_document_types(db: Session = Depends(get_primary_db)):
     """Get all unique document types"""
-    types = db.query(Document.document_type).distinct().filter(
-        Document.document_type.isnot(None),
-        Document.is_deleted == False
-    ).all()
-    return [t[0] for t in types if t[0]]
+    return document_types.values(db)
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-def get_document(document_id: int, db: Session = Depends(get_db)):
+def get_document(document_id: int, conditional: Conditional = Depends(), db: Session = Depends(get_primary_db)):
     """Get a specific document by ID"""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = entity_cache.get(Document, document_id) or entity_cache.load(
+        db, Document, document_id, DocumentResponse, Document.is_deleted == False
+    )
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
+    conditional.check(document.updated_at or document.created_at)
     return document
 
 
@@ -192,15 +388,21 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
     if not db_document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Soft delete
+    # Soft delete; the file is kept until the retention period runs out
     db_document.is_deleted = True
+    db_document.deleted_at = func.now()
     db.commit()
     return {"message": "Document deleted successfully"}
 
 
-@router.get("/{document_id}/download")
-def download_document(document_id: int, db: Session = Depends(get_db)):
-    """Get document download URL"""
+@router.api_route("/{document_id}/download", methods=["GET", "HEAD"])
+def download_document(
+    document_id: int,
+    request: Request,
+    inline: bool = Query(False, description="Display in the browser instead of saving"),
+    db: Session = Depends(get_db)
+):
+    """Download the document file, or redirect to a presigned URL on object storage"""
     document = db.query(Document).filter(
         Document.id == document_id,
         Document.is_deleted == False
@@ -208,8 +410,144 @@ def download_document(document_id: int, db: Session = Depends(get_db)):
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    return {
-        "file_path": document.file_path,
-        "file_name": document.file_name,
-        "mime_type": document.mime_type
-    }
+    storage, key = document_file(document)
+    return file_response(request, key, document.file_name, document.mime_type,
+                         etag=document.content_hash, inline=inline, storage=storage)
+
+
+def _live_document(db: Session, document_id: int) -> Document:
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.is_deleted == False
+    ).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+def _add_version(db: Session, document_id: int, received: ReceivedFile,
+                 comment: Optional[str], uploaded_by: Optional[str]):
+    """Flush the received file as the document's current version; returns (document, delta job)"""
+    document = _live_document(db, document_id)
+    if document.current_version is None:
+        # Uploaded before versioning: its file becomes version 1
+        db.add(versions.first_version(document))
+        document.current_version = 1
+        db.flush()
+    previous = db.query(DocumentVersion).filter(
+        DocumentVersion.document_id == document.id,
+        DocumentVersion.version_number == document.current_version
+    ).one()
+    versions.supersede(previous)
+
+    version = DocumentVersion(
+        document_id=document.id,
+        version_number=previous.version_number + 1,
+        file_name=received.filename,
+        file_path=blob_key(received.sha256),
+        file_size=received.size,
+        file_type=os.path.splitext(received.filename)[1].lstrip('.').upper(),
+        mime_type=received.content_type,
+        content_hash=received.sha256,
+        comment=comment,
+        uploaded_by=uploaded_by,
+    )
+    db.add(version)
+    for field in ("file_name", "file_path", "file_size", "file_type", "mime_type", "content_hash"):
+        setattr(document, field, getattr(version, field))
+    document.current_version = version.version_number
+    document.has_thumbnail = None
+    # Flushing takes the blob row lock before the file is moved into place
+    db.flush()
+    return document, versions.delta_job(previous, version)
+
+
+async def _store_version(db: AsyncDB, document_id: int, received: ReceivedFile,
+                         comment: Optional[str], uploaded_by: Optional[str]):
+    """Make the received file the document's current version; returns (document, delta job)"""
+    try:
+        document, job = await db.run(_add_version, document_id, received, comment, uploaded_by)
+        await run_in_threadpool(place, received)
+        await db.run(Session.commit)
+    except IntegrityError:
+        await db.run(Session.rollback)
+        received.discard()
+        raise HTTPException(status_code=409, detail="Another version of this document was uploaded at the same time")
+    except Exception:
+        await db.run(Session.rollback)
+        received.discard()
+        raise
+    await db.run(Session.refresh, document)
+    return document, job
+
+
+@router.post("/{document_id}/versions", response_model=DocumentResponse, openapi_extra=MULTIPART_FILE_BODY)
+async def upload_document_version(
+    document_id: int,
+    request: Request,
+    comment: Optional[str] = Query(None),
+    uploaded_by: Optional[str] = Query(None),
+    db: AsyncDB = Depends(get_async_db)
+):
+    """Upload a new version of a document's file; earlier versions stay in its history"""
+    document = await db.run(_live_document, document_id)
+    max_size, extensions = await db.run(_upload_rules, document.document_type)
+    check = _extension_check(document.document_type, extensions)
+    received = await receive_file(request, INCOMING_DIR, max_size=max_size, check=check)
+    document, job = await _store_version(db, document_id, received, comment, uploaded_by)
+    _schedule_processing(document)
+    versions.schedule(job)
+    return document
+
+
+@router.get("/{document_id}/versions", response_model=List[DocumentVersionResponse])
+def get_document_versions(document_id: int, db: Session = Depends(get_db)):
+    """Version history of a document, newest first"""
+    document = _live_document(db, document_id)
+    if document.current_version is None:
+        return [versions.first_version(document)]
+    return db.query(DocumentVersion).filter(
+        DocumentVersion.document_id == document_id
+    ).order_by(desc(DocumentVersion.version_number)).all()
+
+
+@router.api_route("/{document_id}/versions/{version_number}/download", methods=["GET", "HEAD"])
+def download_document_version(
+    document_id: int,
+    version_number: int,
+    request: Request,
+    inline: bool = Query(False, description="Display in the browser instead of saving"),
+    db: Session = Depends(get_db)
+):
+    """Download a specific version of the document file"""
+    document = _live_document(db, document_id)
+    if document.current_version is None and version_number == 1:
+        version = versions.first_version(document)
+    else:
+        version = db.query(DocumentVersion).filter(
+            DocumentVersion.document_id == document_id,
+            DocumentVersion.version_number == version_number
+        ).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return versions.version_response(request, db, version, inline=inline)
+
+
+@router.get("/{document_id}/thumbnail")
+def get_document_thumbnail(
+    document_id: int,
+    request: Request,
+    variant: str = Query("thumb", pattern=f"^({'|'.join(thumbnails.VARIANTS)})$"),
+    db: Session = Depends(get_db)
+):
+    """Small JPEG rendering of the document (first page of PDFs)"""
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.is_deleted == False
+    ).first()
+    if not document or not document.has_thumbnail:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+
+    key = thumbnails.variant_key(blob_key(document.content_hash), variant)
+    return file_response(request, key, f"{Path(document.file_name).stem}-{variant}.jpg", "image/jpeg",
+                         etag=f"{document.content_hash}-{variant}", inline=True)
@@ -1,34 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.sequences import next_number
+from app.core.export import export_response, EXPORT_FORMATS
+from app.core.counters import counter_stats
+from app.core.stats import Sum
+from app.models.dashboard_counter import DashboardCounter
 from app.models.expense import Expense
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
 
 router = APIRouter()
 
+expense_stats = counter_stats(
+    "expenses",
+    total_expenses=Sum(DashboardCounter.row_count, cast=int),
+    total_amount=Sum(DashboardCounter.amount, ndigits=2),
+    pending=Sum(DashboardCounter.row_count, DashboardCounter.status == "Pending", cast=int),
+    paid=Sum(DashboardCounter.row_count, DashboardCounter.status == "Paid", cast=int),
+)
+
 @router.get("/stats")
 def get_expense_stats(db: Session = Depends(get_db)):
-    total_expenses = db.query(Expense).count()
-    total_amount = db.query(func.sum(Expense.amount)).scalar() or 0.0
-    pending = db.query(Expense).filter(Expense.status == "Pending").count()
-    paid = db.query(Expense).filter(Expense.status == "Paid").count()
-
-    return {
-        "total_expenses": total_expenses,
-        "total_amount": round(total_amount, 2),
-        "pending": pending,
-        "paid": round(paid, 2)
-    }
+    return expense_stats.compute(db)
 
-@router.get("/", response_model=List[ExpenseResponse])
-def get_expenses(
-    search: Optional[str] = None,
-    status: Optional[str] = None,
-    category: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
+def _expense_query(db: Session, search: Optional[str], status: Optional[str], category: Optional[str]):
     query = db.query(Expense)
 
     if search:
@@ -45,7 +42,32 @@ def get_expenses(
     if category:
         query = query.filter(Expense.category == category)
 
-    return query.order_by(Expense.created_at.desc()).all()
+    return query
+
+@router.get("/", response_model=List[ExpenseResponse])
+def get_expenses(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    query = _expense_query(db, search, status, category)
+    return page.paginate(query, Expense.created_at.desc())
+
+@router.get("/export")
+def export_expenses(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None
+):
+    return export_response(
+        Expense,
+        lambda db: _expense_query(db, search, status, category).order_by(Expense.created_at.desc(), Expense.id.desc()),
+        format,
+        "expenses",
+    )
 
 @router.get("/{expense_id}", response_model=ExpenseResponse)
 def get_expense(expense_id: int, db: Session = Depends(get_db)):
@@ -57,15 +79,7 @@ def get_expense(expense_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=ExpenseResponse)
 def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
     # Auto-generate expense number
-    latest_expense = db.query(Expense).order_by(Expense.id.desc()).first()
-    if latest_expense and latest_expense.expense_number:
-        try:
-            last_num = int(latest_expense.expense_number.split('-')[-1])
-            expense_number = f"EXP-{str(last_num + 1).zfill(3)}"
-        except:
-            expense_number = f"EXP-{str(db.query(Expense).count() + 1).zfill(3)}"
-    else:
-        expense_number = "EXP-001"
+    expense_number = next_number(db, "expenses")
 
     expense_data = expense.model_dump()
     expense_data['expense_number'] = expense_number
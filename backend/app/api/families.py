@@ -1,25 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from ..models.family import Family
 from ..schemas.family import FamilyCreate, FamilyUpdate, FamilyResponse
 from ..core.database import get_db
+from ..core.pagination import Pagination
+from ..core.sequences import next_number
+from ..core.counters import counter_stats
+from ..core.stats import Sum
+from ..models.dashboard_counter import DashboardCounter
 
 router = APIRouter()
 
 @router.post("/", response_model=FamilyResponse)
 def create_family(family: FamilyCreate, db: Session = Depends(get_db)):
     # Auto-generate family ID
-    latest_family = db.query(Family).order_by(Family.id.desc()).first()
-    if latest_family and latest_family.family_id:
-        try:
-            last_num = int(latest_family.family_id.split('-')[-1])
-            family_id = f"FAM-{str(last_num + 1).zfill(3)}"
-        except:
-            family_id = f"FAM-{str(db.query(Family).count() + 1).zfill(3)}"
-    else:
-        family_id = "FAM-001"
+    family_id = next_number(db, "families")
 
     family_data = family.model_dump()
     family_data['family_id'] = family_id
@@ -35,8 +31,7 @@ def create_family(family: FamilyCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[FamilyResponse])
 def get_families(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     status: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -54,27 +49,22 @@ def get_families(
     if status:
         query = query.filter(Family.status == status)
 
-    families = query.order_by(Family.created_at.desc()).offset(skip).limit(limit).all()
+    families = page.paginate(query, Family.created_at.desc())
     return families
 
+family_stats = counter_stats(
+    "families",
+    total_families=Sum(DashboardCounter.row_count, cast=int),
+    active_families=Sum(DashboardCounter.row_count, DashboardCounter.status == "Active", cast=int),
+    total_revenue=Sum(DashboardCounter.amount),
+)
+
 @router.get("/stats")
 def get_family_stats(db: Session = Depends(get_db)):
-    total_families = db.query(func.count(Family.id)).scalar()
-
-    active_families = db.query(func.count(Family.id)).filter(
-        Family.status == "Active"
-    ).scalar()
-
-    total_revenue = db.query(func.sum(Family.lifetime_value)).scalar() or 0.0
-
-    avg_lifetime_value = db.query(func.avg(Family.lifetime_value)).scalar() or 0.0
-
-    return {
-        "total_families": total_families,
-        "active_families": active_families,
-        "total_revenue": total_revenue,
-        "avg_lifetime_value": avg_lifetime_value
-    }
+    stats = family_stats.compute(db)
+    total = stats["total_families"]
+    stats["avg_lifetime_value"] = stats["total_revenue"] / total if total else 0.0
+    return stats
 
 @router.get("/{family_id}", response_model=FamilyResponse)
 def get_family(family_id: int, db: Session = Depends(get_db)):
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from datetime import date
 
+from ..core.conditional import Conditional
 from ..core.database import get_db
+from ..core.pagination import Pagination
+from ..core.counters import counter_stats
+from ..core.stats import Sum
+from ..models.dashboard_counter import DashboardCounter
 from ..models.followup import Followup
 from ..schemas.followup import FollowupCreate, FollowupUpdate, FollowupResponse
 
@@ -20,11 +24,11 @@ def create_followup(followup: FollowupCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[FollowupResponse])
 def get_followups(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     status: Optional[str] = None,
     priority: Optional[str] = None,
     search: Optional[str] = None,
+    conditional: Conditional = Depends(),
     db: Session = Depends(get_db)
 ):
     query = db.query(Followup)
@@ -41,32 +45,24 @@ def get_followups(
             (Followup.description.contains(search))
         )
 
-    followups = query.offset(skip).limit(limit).all()
+    followups = page.paginate(conditional.check_list(query))
     return followups
 
+followup_stats = counter_stats(
+    "followups",
+    total=Sum(DashboardCounter.row_count, cast=int),
+    pending=Sum(DashboardCounter.row_count, DashboardCounter.status == "Pending", cast=int),
+    overdue=Sum(DashboardCounter.row_count, DashboardCounter.status == "Overdue", cast=int),
+    completed=Sum(DashboardCounter.row_count, DashboardCounter.status == "Completed", cast=int),
+)
+
 @router.get("/stats")
 def get_followup_stats(db: Session = Depends(get_db)):
-    total = db.query(func.count(Followup.id)).scalar()
-    pending = db.query(func.count(Followup.id)).filter(
-        Followup.status == "Pending"
-    ).scalar()
-    overdue = db.query(func.count(Followup.id)).filter(
-        Followup.status == "Overdue"
-    ).scalar()
-    completed = db.query(func.count(Followup.id)).filter(
-        Followup.status == "Completed"
-    ).scalar()
-
-    return {
-        "total": total or 0,
-        "pending": pending or 0,
-        "overdue": overdue or 0,
-        "completed": completed or 0
-    }
+    return followup_stats.compute(db)
 
 @router.get("/{followup_id}", response_model=FollowupResponse)
-def get_followup(followup_id: int, db: Session = Depends(get_db)):
-    followup = db.query(Followup).filter(Followup.id == followup_id).first()
+def get_followup(followup_id: int, conditional: Conditional = Depends(), db: Session = Depends(get_db)):
+    followup = conditional.check_record(db.query(Followup).filter(Followup.id == followup_id)).first()
     if not followup:
         raise HTTPException(status_code=404, detail="Follow-up not found")
     return followup
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, String
 from typing import List, Optional
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_db
+from app.core.pagination import Pagination
+from app.core.reference_data import ReferenceData
+from app.core.export import export_response, EXPORT_FORMATS
+from app.core.stats import StatsSpec, Count, Sum, Avg
 from app.models.fuel_log import FuelLog
 from app.models.vehicle import Vehicle
 from app.schemas.fuel_log import FuelLogCreate, FuelLogUpdate, FuelLogResponse
@@ -28,17 +32,7 @@ def create_fuel_log(fuel_log: FuelLogCreate, db: Session = Depends(get_db)):
     return db_fuel_log
 
 
-@router.get("/", response_model=List[FuelLogResponse])
-@router.get("", response_model=List[FuelLogResponse])
-def get_fuel_logs(
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = Query(None),
-    fuel_type: Optional[str] = Query(None),
-    vehicle_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Get all fuel logs with optional filters"""
+def _fuel_log_query(db: Session, search: Optional[str], fuel_type: Optional[str], vehicle_id: Optional[int]):
     query = db.query(FuelLog)
 
     # Apply filters
@@ -58,34 +52,63 @@ def get_fuel_logs(
     if vehicle_id:
         query = query.filter(FuelLog.vehicle_id == vehicle_id)
 
-    fuel_logs = query.order_by(desc(FuelLog.date), desc(FuelLog.id)).offset(skip).limit(limit).all()
+    return query
+
+
+@router.get("/", response_model=List[FuelLogResponse])
+@router.get("", response_model=List[FuelLogResponse])
+def get_fuel_logs(
+    page: Pagination = Depends(),
+    search: Optional[str] = Query(None),
+    fuel_type: Optional[str] = Query(None),
+    vehicle_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get all fuel logs with optional filters"""
+    query = _fuel_log_query(db, search, fuel_type, vehicle_id)
+    fuel_logs = page.paginate(query, desc(FuelLog.date), desc(FuelLog.id))
     return fuel_logs
 
 
+@router.get("/export")
+def export_fuel_logs(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = Query(None),
+    fuel_type: Optional[str] = Query(None),
+    vehicle_id: Optional[int] = Query(None)
+):
+    """Stream all fuel logs as NDJSON or CSV"""
+    return export_response(
+        FuelLog,
+        lambda db: _fuel_log_query(db, search, fuel_type, vehicle_id).order_by(desc(FuelLog.date), desc(FuelLog.id)),
+        format,
+        "fuel_logs",
+    )
+
+
+fuel_log_stats = StatsSpec(
+    FuelLog,
+    total_logs=Count(),
+    total_fuel=Sum(FuelLog.quantity),
+    total_cost=Sum(FuelLog.cost),
+    # Average MPG only over logs with MPG data
+    avg_mpg=Avg(FuelLog.mpg, FuelLog.mpg.isnot(None)),
+)
+
+
 @router.get("/stats", response_model=dict)
 def get_fuel_log_stats(db: Session = Depends(get_db)):
     """Get fuel log statistics"""
-    total_logs = db.query(FuelLog).count()
-
-    total_fuel = db.query(func.sum(FuelLog.quantity)).scalar() or Decimal(0)
-    total_cost = db.query(func.sum(FuelLog.cost)).scalar() or Decimal(0)
+    return fuel_log_stats.compute(db)
 
-    # Calculate average MPG (only from logs with MPG data)
-    avg_mpg = db.query(func.avg(FuelLog.mpg)).filter(FuelLog.mpg.isnot(None)).scalar() or Decimal(0)
 
-    return {
-        "total_logs": total_logs,
-        "total_fuel": float(total_fuel),
-        "total_cost": float(total_cost),
-        "avg_mpg": float(avg_mpg),
-    }
+fuel_types = ReferenceData("fuel_logs.fuel_types", FuelLog.fuel_type)
 
 
 @router.get("/fuel-types", response_model=List[str])
-def get_fuel_types(db: Session = Depends(get_db)):
+def get_fuel_types(db: Session = Depends(get_primary_db)):
     """Get all unique fuel types from logs"""
-    types = db.query(FuelLog.fuel_type).distinct().filter(FuelLog.fuel_type.isnot(None)).all()
-    return [t[0] for t in types if t[0]]
+    return fuel_types.values(db)
 
 
 @router.get("/{fuel_log_id}", response_model=FuelLogResponse)
@@ -1,45 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, String, cast
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_async_db, get_async_primary_db, AsyncDB
+from app.core.entity_cache import entity_cache
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.export import export_response, EXPORT_FORMATS
+from app.core.search import apply_search
+from app.core.counters import counter_stats
+from app.core.stats import Sum
+from app.models.dashboard_counter import DashboardCounter
 from app.models.invoice import Invoice
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
 
 router = APIRouter()
 
+invoice_stats = counter_stats(
+    "invoices",
+    total_invoices=Sum(DashboardCounter.row_count, cast=int),
+    total_revenue=Sum(DashboardCounter.amount, ndigits=2),
+    outstanding=Sum(DashboardCounter.balance, ndigits=2),
+    # Open invoices are bucketed by their ISO due date
+    overdue=Sum(
+        DashboardCounter.row_count,
+        DashboardCounter.bucket != "",
+        DashboardCounter.bucket < cast(func.current_date(), String),
+        cast=int,
+    ),
+)
+
 @router.get("/stats")
-def get_invoice_stats(db: Session = Depends(get_db)):
-    total_invoices = db.query(Invoice).count()
-    total_revenue = db.query(func.sum(Invoice.total_amount)).scalar() or 0.0
-    outstanding = db.query(func.sum(Invoice.balance)).filter(Invoice.balance > 0).scalar() or 0.0
-    overdue = db.query(Invoice).filter(
-        Invoice.balance > 0,
-        Invoice.due_date < func.current_date()
-    ).count()
-
-    return {
-        "total_invoices": total_invoices,
-        "total_revenue": round(total_revenue, 2),
-        "outstanding": round(outstanding, 2),
-        "overdue": overdue
-    }
+async def get_invoice_stats(db: AsyncDB = Depends(get_async_db)):
+    return await db.run(invoice_stats.compute)
 
-@router.get("/", response_model=List[InvoiceResponse])
-def get_invoices(
-    search: Optional[str] = None,
-    status: Optional[str] = None,
-    branch: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
+def _invoice_query(db: Session, search: Optional[str], status: Optional[str], branch: Optional[str]):
     query = db.query(Invoice)
 
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Invoice.invoice_number.ilike(search_filter)) |
-            (Invoice.client_name.ilike(search_filter))
-        )
+        query = apply_search(query, Invoice, search)
 
     if status:
         query = query.filter(Invoice.status == status)
@@ -47,13 +47,43 @@ def get_invoices(
     if branch:
         query = query.filter(Invoice.branch == branch)
 
-    return query.order_by(Invoice.created_at.desc()).all()
+    return query
+
+@router.get("/", response_model=List[InvoiceResponse])
+async def get_invoices(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    branch: Optional[str] = None,
+    render: Renderer = Depends(),
+    db: AsyncDB = Depends(get_async_db)
+):
+    return await db.run(lambda session: render.rows(
+        page.paginate(_invoice_query(session, search, status, branch), Invoice.created_at.desc()), InvoiceResponse
+    ))
+
+@router.get("/export")
+def export_invoices(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    branch: Optional[str] = None
+):
+    return export_response(
+        Invoice,
+        lambda db: _invoice_query(db, search, status, branch).order_by(Invoice.created_at.desc(), Invoice.id.desc()),
+        format,
+        "invoices",
+    )
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
-def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+async def get_invoice(invoice_id: int, conditional: Conditional = Depends(), db: AsyncDB = Depends(get_async_primary_db)):
+    invoice = entity_cache.get(Invoice, invoice_id)
+    if invoice is None:
+        invoice = await db.run(entity_cache.load, Invoice, invoice_id, InvoiceResponse)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    conditional.check(invoice.updated_at or invoice.created_at)
     return invoice
 
 @router.post("/", response_model=InvoiceResponse)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
 from app.models.next_of_kin import NextOfKin
 from app.schemas.next_of_kin import NextOfKinCreate, NextOfKinUpdate, NextOfKinResponse
 
@@ -22,9 +23,9 @@ def create_next_of_kin(next_of_kin: NextOfKinCreate, db: Session = Depends(get_d
 
 @router.get("/", response_model=List[NextOfKinResponse])
 @router.get("", response_model=List[NextOfKinResponse])
-def get_next_of_kin(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_next_of_kin(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all next of kin contacts"""
-    contacts = db.query(NextOfKin).order_by(NextOfKin.created_at.desc()).offset(skip).limit(limit).all()
+    contacts = page.paginate(db.query(NextOfKin), NextOfKin.created_at.desc())
     return contacts
 
 
@@ -1,45 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, AsyncDB
+from app.core.pagination import Pagination
+from app.core.sequences import next_number
+from app.core.export import export_response, EXPORT_FORMATS
+from app.core.search import apply_search
+from app.core.counters import counter_stats
+from app.core.stats import Sum
+from app.models.dashboard_counter import DashboardCounter
 from app.models.payment import Payment
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
 
 router = APIRouter()
 
+payment_stats = counter_stats(
+    "payments",
+    total_payments=Sum(DashboardCounter.row_count, cast=int),
+    total_received=Sum(DashboardCounter.amount, DashboardCounter.status.in_(["Completed", "Cleared"]), ndigits=2),
+    pending=Sum(DashboardCounter.row_count, DashboardCounter.status == "Pending", cast=int),
+    processing=Sum(DashboardCounter.row_count, DashboardCounter.status == "Processing", cast=int),
+)
+
 @router.get("/stats")
-def get_payment_stats(db: Session = Depends(get_db)):
-    total_payments = db.query(Payment).count()
-    total_received = db.query(func.sum(Payment.amount)).filter(
-        Payment.status.in_(["Completed", "Cleared"])
-    ).scalar() or 0.0
-    pending = db.query(Payment).filter(Payment.status == "Pending").count()
-    processing = db.query(Payment).filter(Payment.status == "Processing").count()
-
-    return {
-        "total_payments": total_payments,
-        "total_received": round(total_received, 2),
-        "pending": pending,
-        "processing": processing
-    }
+async def get_payment_stats(db: AsyncDB = Depends(get_async_db)):
+    return await db.run(payment_stats.compute)
 
-@router.get("/", response_model=List[PaymentResponse])
-def get_payments(
-    search: Optional[str] = None,
-    status: Optional[str] = None,
-    payment_method: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
+def _payment_query(db: Session, search: Optional[str], status: Optional[str], payment_method: Optional[str]):
     query = db.query(Payment)
 
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Payment.payment_number.ilike(search_filter)) |
-            (Payment.payer_name.ilike(search_filter)) |
-            (Payment.invoice_number.ilike(search_filter))
-        )
+        query = apply_search(query, Payment, search)
 
     if status:
         query = query.filter(Payment.status == status)
@@ -47,11 +38,37 @@ def get_payments(
     if payment_method:
         query = query.filter(Payment.payment_method == payment_method)
 
-    return query.order_by(Payment.created_at.desc()).all()
+    return query
+
+@router.get("/", response_model=List[PaymentResponse])
+async def get_payments(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    db: AsyncDB = Depends(get_async_db)
+):
+    return await db.run(
+        lambda session: page.paginate(_payment_query(session, search, status, payment_method), Payment.created_at.desc())
+    )
+
+@router.get("/export")
+def export_payments(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    payment_method: Optional[str] = None
+):
+    return export_response(
+        Payment,
+        lambda db: _payment_query(db, search, status, payment_method).order_by(Payment.created_at.desc(), Payment.id.desc()),
+        format,
+        "payments",
+    )
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
-def get_payment(payment_id: int, db: Session = Depends(get_db)):
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+async def get_payment(payment_id: int, db: AsyncDB = Depends(get_async_db)):
+    payment = await db.run(lambda session: session.query(Payment).filter(Payment.id == payment_id).first())
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     return payment
@@ -59,16 +76,7 @@ def get_payment(payment_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=PaymentResponse)
 def create_payment(payment: PaymentCreate, db: Session = Depends(get_db)):
     # Auto-generate payment number
-    latest_payment = db.query(Payment).order_by(Payment.id.desc()).first()
-    if latest_payment and latest_payment.payment_number:
-        # Extract number from PAY-001 format
-        try:
-            last_num = int(latest_payment.payment_number.split('-')[-1])
-            payment_number = f"PAY-{str(last_num + 1).zfill(3)}"
-        except:
-            payment_number = f"PAY-{str(db.query(Payment).count() + 1).zfill(3)}"
-    else:
-        payment_number = "PAY-001"
+    payment_number = next_number(db, "payments")
 
     payment_data = payment.model_dump()
     payment_data['payment_number'] = payment_number
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
+import mimetypes
 
-from ..core.database import get_db
+from ..core.database import get_db, get_async_db, AsyncDB
+from ..core.pagination import Pagination
+from ..core.stats import StatsSpec, Count, Sum
+from ..core.storage import INCOMING_DIR, LEGACY_FILES, file_response, get_storage
+from ..core.uploads import ReceivedFile, receive_file, MULTIPART_FILE_BODY
 from ..models.preneed import Preneed
 from ..schemas.preneed import PreneedCreate, PreneedUpdate, PreneedResponse
 
@@ -19,8 +23,7 @@ def create_preneed(preneed: PreneedCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[PreneedResponse])
 def get_preneeds(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     status: Optional[str] = None,
     payment_plan: Optional[str] = None,
     search: Optional[str] = None,
@@ -40,24 +43,20 @@ def get_preneeds(
             (Preneed.service_type.contains(search))
         )
 
-    preneeds = query.offset(skip).limit(limit).all()
+    preneeds = page.paginate(query)
     return preneeds
 
+preneed_stats = StatsSpec(
+    Preneed,
+    total_plans=Count(),
+    active_plans=Count(Preneed.status == "Active"),
+    total_value=Sum(Preneed.estimated_cost),
+    total_paid=Sum(Preneed.amount_paid),
+)
+
 @router.get("/stats")
 def get_preneed_stats(db: Session = Depends(get_db)):
-    total = db.query(func.count(Preneed.id)).scalar()
-    active = db.query(func.count(Preneed.id)).filter(
-        Preneed.status == "Active"
-    ).scalar()
-    total_value = db.query(func.sum(Preneed.estimated_cost)).scalar()
-    total_paid = db.query(func.sum(Preneed.amount_paid)).scalar()
-
-    return {
-        "total_plans": total or 0,
-        "active_plans": active or 0,
-        "total_value": total_value or 0.0,
-        "total_paid": total_paid or 0.0
-    }
+    return preneed_stats.compute(db)
 
 @router.get("/{preneed_id}", response_model=PreneedResponse)
 def get_preneed(preneed_id: int, db: Session = Depends(get_db)):
@@ -89,3 +88,61 @@ def delete_preneed(preneed_id: int, db: Session = Depends(get_db)):
     db.delete(db_preneed)
     db.commit()
     return {"message": "Pre-need plan deleted successfully"}
+
+CONTRACT_PREFIX = "contracts/"
+
+def _store_contract(db: Session, preneed_id: int, received: ReceivedFile) -> Preneed:
+    db_preneed = db.query(Preneed).filter(Preneed.id == preneed_id).first()
+    if not db_preneed:
+        raise HTTPException(status_code=404, detail="Pre-need plan not found")
+
+    storage = get_storage()
+    previous = db_preneed.contract_document
+    key = f"{CONTRACT_PREFIX}{preneed_id}/{received.sha256}/{received.filename}"
+    storage.put_file(key, received.path)
+    try:
+        db_preneed.contract_document = key
+        db.commit()
+    except Exception:
+        db.rollback()
+        if key != previous:
+            storage.delete(key)
+        raise
+    db.refresh(db_preneed)
+
+    if previous and previous != key and previous.startswith(CONTRACT_PREFIX):
+        storage.delete(previous)
+    return db_preneed
+
+@router.post("/{preneed_id}/contract", response_model=PreneedResponse, openapi_extra=MULTIPART_FILE_BODY)
+async def upload_contract(preneed_id: int, request: Request, db: AsyncDB = Depends(get_async_db)):
+    """Upload the signed contract, replacing any previous one"""
+    received = await receive_file(request, INCOMING_DIR)
+    try:
+        return await db.run(_store_contract, preneed_id, received)
+    finally:
+        # No-op once the file has been handed to storage
+        received.discard()
+
+@router.api_route("/{preneed_id}/contract", methods=["GET", "HEAD"])
+def download_contract(
+    preneed_id: int,
+    request: Request,
+    inline: bool = Query(False, description="Display in the browser instead of saving"),
+    db: Session = Depends(get_db)
+):
+    """Download the contract, or redirect to a presigned URL on object storage"""
+    db_preneed = db.query(Preneed).filter(Preneed.id == preneed_id).first()
+    if not db_preneed:
+        raise HTTPException(status_code=404, detail="Pre-need plan not found")
+    if not db_preneed.contract_document:
+        raise HTTPException(status_code=404, detail="No contract uploaded")
+
+    key = db_preneed.contract_document
+    filename = key.rsplit("/", 1)[-1]
+    media_type = mimetypes.guess_type(filename)[0]
+    if not key.startswith(CONTRACT_PREFIX):
+        # A path recorded before contracts were uploaded through the API
+        return file_response(request, key, filename, media_type, inline=inline, storage=LEGACY_FILES)
+    etag = key[len(CONTRACT_PREFIX):].split("/")[1]
+    return file_response(request, key, filename, media_type, etag=etag, inline=inline)
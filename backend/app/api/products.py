@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
 
@@ -29,9 +30,9 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[ProductResponse])
 @router.get("", response_model=List[ProductResponse])
-def get_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_products(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all products"""
-    products = db.query(Product).order_by(Product.created_at.desc()).offset(skip).limit(limit).all()
+    products = page.paginate(db.query(Product), Product.created_at.desc())
     return products
 
 
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 from ..core.database import get_db
+from ..core.pagination import Pagination
+from ..core.sequences import next_number
 from ..models.purchase_order import PurchaseOrder
 from ..schemas.purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse
 
@@ -10,9 +12,9 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[PurchaseOrderResponse])
-def get_purchase_orders(db: Session = Depends(get_db)):
+def get_purchase_orders(page: Pagination = Depends(), db: Session = Depends(get_db)):
     """Get all purchase orders"""
-    orders = db.query(PurchaseOrder).all()
+    orders = page.paginate(db.query(PurchaseOrder))
     return orders
 
 
@@ -32,8 +34,7 @@ def create_purchase_order(order: PurchaseOrderCreate, db: Session = Depends(get_
     order_data = order.model_dump()
     if not order_data.get('po_number'):
         # Generate PO number (e.g., "PO-2025-0001")
-        order_count = db.query(PurchaseOrder).count()
-        order_data['po_number'] = f"PO-2025-{str(order_count + 1).zfill(4)}"
+        order_data['po_number'] = next_number(db, "purchase_orders")
 
     # Check if po_number already exists
     existing = db.query(PurchaseOrder).filter(PurchaseOrder.po_number == order_data['po_number']).first()
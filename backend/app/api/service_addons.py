@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_db
+from app.core.pagination import Pagination
+from app.core.reference_data import ReferenceData
+from app.core.stats import StatsSpec, Count, CountDistinct, Avg
 from app.models.service_addon import ServiceAddon
 from app.schemas.service_addon import ServiceAddonCreate, ServiceAddonUpdate, ServiceAddonResponse
 
@@ -24,8 +27,7 @@ def create_service_addon(addon: ServiceAddonCreate, db: Session = Depends(get_db
 @router.get("/", response_model=List[ServiceAddonResponse])
 @router.get("", response_model=List[ServiceAddonResponse])
 def get_service_addons(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
@@ -51,36 +53,32 @@ def get_service_addons(
         elif status == "Inactive":
             query = query.filter(ServiceAddon.is_active == False)
 
-    addons = query.order_by(ServiceAddon.display_order, ServiceAddon.name).offset(skip).limit(limit).all()
+    addons = page.paginate(query, ServiceAddon.display_order, ServiceAddon.name)
     return addons
 
 
+service_addon_stats = StatsSpec(
+    ServiceAddon,
+    total=Count(),
+    active=Count(ServiceAddon.is_active == True),
+    categories=CountDistinct(ServiceAddon.category),
+    avg_price=Avg(ServiceAddon.unit_price),
+)
+
+
 @router.get("/stats", response_model=dict)
 def get_service_addon_stats(db: Session = Depends(get_db)):
     """Get service add-on statistics"""
-    total = db.query(ServiceAddon).count()
-    active = db.query(ServiceAddon).filter(ServiceAddon.is_active == True).count()
-
-    # Count unique categories
-    categories = db.query(func.count(func.distinct(ServiceAddon.category))).scalar()
+    return service_addon_stats.compute(db)
 
-    # Calculate average price
-    avg_price_result = db.query(func.avg(ServiceAddon.unit_price)).scalar()
-    avg_price = float(avg_price_result) if avg_price_result else 0.00
 
-    return {
-        "total": total,
-        "active": active,
-        "categories": categories or 0,
-        "avg_price": avg_price,
-    }
+addon_categories = ReferenceData("service_addons.categories", ServiceAddon.category)
 
 
 @router.get("/categories", response_model=List[str])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_primary_db)):
     """Get all unique categories"""
-    categories = db.query(ServiceAddon.category).distinct().filter(ServiceAddon.category.isnot(None)).all()
-    return [cat[0] for cat in categories if cat[0]]
+    return addon_categories.values(db)
 
 
 @router.get("/{addon_id}", response_model=ServiceAddonResponse)
@@ -3,7 +3,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_primary_db
+from app.core.entity_cache import entity_cache
+from app.core.fieldsets import Fieldset
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.stats import StatsSpec, Count
 from app.models.staff import Staff
 from app.schemas.staff import StaffCreate, StaffUpdate, StaffResponse
 
@@ -29,13 +35,14 @@ def create_staff(staff: StaffCreate, db: Session = Depends(get_db)):
 @router.get("/", response_model=List[StaffResponse])
 @router.get("", response_model=List[StaffResponse])
 def get_staff(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     department: Optional[str] = None,
     employment_type: Optional[str] = None,
     status: Optional[str] = None,
     branch: Optional[str] = None,
+    fields: Fieldset = Depends(),
+    render: Renderer = Depends(),
     db: Session = Depends(get_db)
 ):
     """Get all staff members with optional filters"""
@@ -64,32 +71,32 @@ def get_staff(
     if branch:
         query = query.filter(Staff.branch == branch)
 
-    staff_members = query.order_by(Staff.created_at.desc()).offset(skip).limit(limit).all()
-    return staff_members
+    staff_members = page.paginate(fields.select(query, StaffResponse), Staff.created_at.desc())
+    return render.rows(staff_members, StaffResponse, fields.names)
+
+
+staff_stats = StatsSpec(
+    Staff,
+    total_staff=Count(),
+    active_staff=Count(Staff.status == "Active"),
+    full_time=Count(Staff.employment_type == "Full-Time", Staff.status == "Active"),
+    part_time=Count(Staff.employment_type == "Part-Time", Staff.status == "Active"),
+)
 
 
 @router.get("/stats")
 def get_staff_stats(db: Session = Depends(get_db)):
     """Get staff statistics"""
-    total_staff = db.query(Staff).count()
-    active_staff = db.query(Staff).filter(Staff.status == "Active").count()
-    full_time = db.query(Staff).filter(and_(Staff.employment_type == "Full-Time", Staff.status == "Active")).count()
-    part_time = db.query(Staff).filter(and_(Staff.employment_type == "Part-Time", Staff.status == "Active")).count()
-
-    return {
-        "total_staff": total_staff,
-        "active_staff": active_staff,
-        "full_time": full_time,
-        "part_time": part_time
-    }
+    return staff_stats.compute(db)
 
 
 @router.get("/{staff_id}", response_model=StaffResponse)
-def get_staff_by_id(staff_id: int, db: Session = Depends(get_db)):
+def get_staff_by_id(staff_id: int, conditional: Conditional = Depends(), db: Session = Depends(get_primary_db)):
     """Get a specific staff member by ID"""
-    staff = db.query(Staff).filter(Staff.id == staff_id).first()
+    staff = entity_cache.get(Staff, staff_id) or entity_cache.load(db, Staff, staff_id, StaffResponse)
     if not staff:
         raise HTTPException(status_code=404, detail="Staff member not found")
+    conditional.check(staff.updated_at or staff.created_at)
     return staff
 
 
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.conditional import Conditional
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.stats import StatsSpec, Count
 from app.models.schedule import Schedule
 from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse
 
@@ -20,12 +23,12 @@ def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[ScheduleResponse])
 def get_schedules(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = None,
     status: Optional[str] = None,
     shift_type: Optional[str] = None,
     staff_member: Optional[str] = None,
+    conditional: Conditional = Depends(),
     db: Session = Depends(get_db)
 ):
     """Get all schedules with optional filters"""
@@ -45,30 +48,29 @@ def get_schedules(
     if staff_member:
         query = query.filter(Schedule.staff_member_name.ilike(f"%{staff_member}%"))
 
-    schedules = query.order_by(Schedule.shift_date.desc()).offset(skip).limit(limit).all()
+    schedules = page.paginate(conditional.check_list(query), Schedule.shift_date.desc())
     return schedules
 
 
+schedule_stats = StatsSpec(
+    Schedule,
+    total_schedules=Count(),
+    scheduled=Count(Schedule.status == "Scheduled"),
+    completed=Count(Schedule.status == "Completed"),
+    overtime_shifts=Count(Schedule.is_overtime == True),
+)
+
+
 @router.get("/stats")
 def get_schedule_stats(db: Session = Depends(get_db)):
     """Get schedule statistics"""
-    total_schedules = db.query(Schedule).count()
-    scheduled = db.query(Schedule).filter(Schedule.status == "Scheduled").count()
-    completed = db.query(Schedule).filter(Schedule.status == "Completed").count()
-    overtime_shifts = db.query(Schedule).filter(Schedule.is_overtime == True).count()
-
-    return {
-        "total_schedules": total_schedules,
-        "scheduled": scheduled,
-        "completed": completed,
-        "overtime_shifts": overtime_shifts
-    }
+    return schedule_stats.compute(db)
 
 
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
-def get_schedule(schedule_id: int, db: Session = Depends(get_db)):
+def get_schedule(schedule_id: int, conditional: Conditional = Depends(), db: Session = Depends(get_db)):
     """Get a specific schedule by ID"""
-    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    schedule = conditional.check_record(db.query(Schedule).filter(Schedule.id == schedule_id)).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     return schedule
@@ -2,14 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.sequences import next_number
 from app.models.stock_movement import StockMovement
 from app.schemas.stock_movement import StockMovementCreate, StockMovementUpdate, StockMovementResponse
 
 router = APIRouter()
 
 @router.get("/", response_model=List[StockMovementResponse])
-def get_stock_movements(db: Session = Depends(get_db)):
-    movements = db.query(StockMovement).order_by(StockMovement.movement_date.desc()).all()
+def get_stock_movements(page: Pagination = Depends(), db: Session = Depends(get_db)):
+    movements = page.paginate(db.query(StockMovement), StockMovement.movement_date.desc())
     return movements
 
 @router.get("/{movement_id}", response_model=StockMovementResponse)
@@ -22,8 +24,7 @@ def get_stock_movement(movement_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=StockMovementResponse)
 def create_stock_movement(movement: StockMovementCreate, db: Session = Depends(get_db)):
     # Generate movement_id
-    movement_count = db.query(StockMovement).count()
-    movement_id = f"MOV-2025-{str(movement_count + 1).zfill(4)}"
+    movement_id = next_number(db, "stock_movements")
 
     # Create movement data
     movement_data = movement.model_dump()
@@ -3,7 +3,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_async_db, AsyncDB
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.counters import counter_stats
+from app.core.stats import Sum
+from app.models.dashboard_counter import DashboardCounter
 from app.models.task import Task
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
 
@@ -21,18 +27,7 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     return db_task
 
 
-@router.get("/", response_model=List[TaskResponse])
-@router.get("", response_model=List[TaskResponse])
-def get_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = None,
-    status: Optional[str] = None,
-    priority: Optional[str] = None,
-    category: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    """Get all tasks with optional filters"""
+def _task_query(db: Session, search: Optional[str], status: Optional[str], priority: Optional[str], category: Optional[str]):
     query = db.query(Task)
 
     # Apply filters
@@ -55,30 +50,47 @@ def get_tasks(
     if category:
         query = query.filter(Task.category == category)
 
-    tasks = query.order_by(Task.due_date.asc(), Task.created_at.desc()).offset(skip).limit(limit).all()
-    return tasks
+    return query
+
+
+@router.get("/", response_model=List[TaskResponse])
+@router.get("", response_model=List[TaskResponse])
+async def get_tasks(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    conditional: Conditional = Depends(),
+    render: Renderer = Depends(),
+    db: AsyncDB = Depends(get_async_db)
+):
+    """Get all tasks with optional filters"""
+    return await db.run(lambda session: render.rows(page.paginate(
+        conditional.check_list(_task_query(session, search, status, priority, category)),
+        Task.due_date.asc(), Task.created_at.desc()
+    ), TaskResponse))
+
+
+task_stats = counter_stats(
+    "tasks",
+    total_tasks=Sum(DashboardCounter.row_count, cast=int),
+    pending=Sum(DashboardCounter.row_count, DashboardCounter.status == "Pending", cast=int),
+    in_progress=Sum(DashboardCounter.row_count, DashboardCounter.status == "In Progress", cast=int),
+    completed=Sum(DashboardCounter.row_count, DashboardCounter.status == "Completed", cast=int),
+)
 
 
 @router.get("/stats")
-def get_task_stats(db: Session = Depends(get_db)):
+async def get_task_stats(db: AsyncDB = Depends(get_async_db)):
     """Get task statistics"""
-    total_tasks = db.query(Task).count()
-    pending = db.query(Task).filter(Task.status == "Pending").count()
-    in_progress = db.query(Task).filter(Task.status == "In Progress").count()
-    completed = db.query(Task).filter(Task.status == "Completed").count()
-
-    return {
-        "total_tasks": total_tasks,
-        "pending": pending,
-        "in_progress": in_progress,
-        "completed": completed
-    }
+    return await db.run(task_stats.compute)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task_by_id(task_id: int, db: Session = Depends(get_db)):
+async def get_task_by_id(task_id: int, conditional: Conditional = Depends(), db: AsyncDB = Depends(get_async_db)):
     """Get a specific task by ID"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.run(lambda session: conditional.check_record(session.query(Task).filter(Task.id == task_id)).first())
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
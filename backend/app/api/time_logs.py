@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.export import export_response, EXPORT_FORMATS
+from app.core.stats import StatsSpec, Count, Sum
 from app.models.time_log import TimeLog
 from app.schemas.time_log import TimeLogCreate, TimeLogUpdate, TimeLogResponse
 
@@ -19,17 +21,7 @@ def create_time_log(time_log: TimeLogCreate, db: Session = Depends(get_db)):
     return db_time_log
 
 
-@router.get("/", response_model=List[TimeLogResponse])
-def get_time_logs(
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = None,
-    status: Optional[str] = None,
-    log_type: Optional[str] = None,
-    staff_member: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    """Get all time logs with optional filters"""
+def _time_log_query(db: Session, search: Optional[str], status: Optional[str], log_type: Optional[str], staff_member: Optional[str]):
     query = db.query(TimeLog)
 
     if search:
@@ -46,24 +38,54 @@ def get_time_logs(
     if staff_member:
         query = query.filter(TimeLog.staff_member_name.ilike(f"%{staff_member}%"))
 
-    time_logs = query.order_by(TimeLog.log_date.desc()).offset(skip).limit(limit).all()
+    return query
+
+
+@router.get("/", response_model=List[TimeLogResponse])
+def get_time_logs(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    log_type: Optional[str] = None,
+    staff_member: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get all time logs with optional filters"""
+    query = _time_log_query(db, search, status, log_type, staff_member)
+    time_logs = page.paginate(query, TimeLog.log_date.desc())
     return time_logs
 
 
+@router.get("/export")
+def export_time_logs(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    log_type: Optional[str] = None,
+    staff_member: Optional[str] = None
+):
+    """Stream all time logs as NDJSON or CSV"""
+    return export_response(
+        TimeLog,
+        lambda db: _time_log_query(db, search, status, log_type, staff_member).order_by(TimeLog.log_date.desc(), TimeLog.id.desc()),
+        format,
+        "time_logs",
+    )
+
+
+time_log_stats = StatsSpec(
+    TimeLog,
+    total_logs=Count(),
+    total_hours=Sum(TimeLog.hours_worked, ndigits=2),
+    total_pay=Sum(TimeLog.total_pay, ndigits=2),
+    overtime_hours=Sum(TimeLog.hours_worked, TimeLog.is_overtime == True, ndigits=2),
+)
+
+
 @router.get("/stats")
 def get_time_log_stats(db: Session = Depends(get_db)):
     """Get time log statistics"""
-    total_logs = db.query(TimeLog).count()
-    total_hours = db.query(func.sum(TimeLog.hours_worked)).scalar() or 0.0
-    total_pay = db.query(func.sum(TimeLog.total_pay)).scalar() or 0.0
-    overtime_hours = db.query(func.sum(TimeLog.hours_worked)).filter(TimeLog.is_overtime == True).scalar() or 0.0
-
-    return {
-        "total_logs": total_logs,
-        "total_hours": round(total_hours, 2),
-        "total_pay": round(total_pay, 2),
-        "overtime_hours": round(overtime_hours, 2)
-    }
+    return time_log_stats.compute(db)
 
 
 @router.get("/{time_log_id}", response_model=TimeLogResponse)
@@ -1,25 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 from ..models.transaction import Transaction
 from ..schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
 from ..core.database import get_db
+from ..core.pagination import Pagination
+from ..core.sequences import next_number
+from ..core.export import export_response, EXPORT_FORMATS
+from ..core.counters import counter_stats
+from ..core.stats import Sum
+from ..models.dashboard_counter import DashboardCounter
 
 router = APIRouter()
 
 @router.post("/", response_model=TransactionResponse)
 def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
     # Auto-generate transaction ID
-    latest_transaction = db.query(Transaction).order_by(Transaction.id.desc()).first()
-    if latest_transaction and latest_transaction.transaction_id:
-        try:
-            last_num = int(latest_transaction.transaction_id.split('-')[-1])
-            transaction_id = f"TXN-{str(last_num + 1).zfill(3)}"
-        except:
-            transaction_id = f"TXN-{str(db.query(Transaction).count() + 1).zfill(3)}"
-    else:
-        transaction_id = "TXN-001"
+    transaction_id = next_number(db, "transactions")
 
     transaction_data = transaction.model_dump()
     transaction_data['transaction_id'] = transaction_id
@@ -30,15 +27,7 @@ def create_transaction(transaction: TransactionCreate, db: Session = Depends(get
     db.refresh(db_transaction)
     return db_transaction
 
-@router.get("/", response_model=List[TransactionResponse])
-def get_transactions(
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = None,
-    transaction_type: Optional[str] = None,
-    category: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
+def _transaction_query(db: Session, search: Optional[str], transaction_type: Optional[str], category: Optional[str]):
     query = db.query(Transaction)
 
     if search:
@@ -54,29 +43,47 @@ def get_transactions(
     if category:
         query = query.filter(Transaction.category == category)
 
-    transactions = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[TransactionResponse])
+def get_transactions(
+    page: Pagination = Depends(),
+    search: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    query = _transaction_query(db, search, transaction_type, category)
+    transactions = page.paginate(query, Transaction.transaction_date.desc())
     return transactions
 
+@router.get("/export")
+def export_transactions(
+    format: str = Query("ndjson", pattern=EXPORT_FORMATS),
+    search: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None
+):
+    return export_response(
+        Transaction,
+        lambda db: _transaction_query(db, search, transaction_type, category).order_by(Transaction.transaction_date.desc(), Transaction.id.desc()),
+        format,
+        "transactions",
+    )
+
+# Transaction counters use the transaction type as their status
+transaction_stats = counter_stats(
+    "transactions",
+    total_transactions=Sum(DashboardCounter.row_count, cast=int),
+    income=Sum(DashboardCounter.amount, DashboardCounter.status == "Income"),
+    expenses=Sum(DashboardCounter.amount, DashboardCounter.status == "Expense"),
+)
+
 @router.get("/stats")
 def get_transaction_stats(db: Session = Depends(get_db)):
-    total_transactions = db.query(func.count(Transaction.id)).scalar()
-
-    income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.transaction_type == "Income"
-    ).scalar() or 0.0
-
-    expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.transaction_type == "Expense"
-    ).scalar() or 0.0
-
-    net = income - expenses
-
-    return {
-        "total_transactions": total_transactions,
-        "income": income,
-        "expenses": expenses,
-        "net": net
-    }
+    stats = transaction_stats.compute(db)
+    stats["net"] = stats["income"] - stats["expenses"]
+    return stats
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_db
+from app.core.pagination import Pagination
+from app.core.reference_data import ReferenceData
+from app.core.stats import StatsSpec, Count
 from app.models.vehicle_assignment import VehicleAssignment
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle_assignment import VehicleAssignmentCreate, VehicleAssignmentUpdate, VehicleAssignmentResponse
@@ -30,8 +33,7 @@ def create_assignment(assignment: VehicleAssignmentCreate, db: Session = Depends
 @router.get("/", response_model=List[VehicleAssignmentResponse])
 @router.get("", response_model=List[VehicleAssignmentResponse])
 def get_assignments(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     assignment_type: Optional[str] = Query(None),
@@ -56,37 +58,32 @@ def get_assignments(
     if assignment_type and assignment_type != "All Types":
         query = query.filter(VehicleAssignment.assignment_type == assignment_type)
 
-    assignments = query.order_by(VehicleAssignment.scheduled_start.desc()).offset(skip).limit(limit).all()
+    assignments = page.paginate(query, VehicleAssignment.scheduled_start.desc())
     return assignments
 
 
+assignment_stats = StatsSpec(
+    VehicleAssignment,
+    total=Count(),
+    scheduled=Count(VehicleAssignment.status == "Scheduled"),
+    in_progress=Count(VehicleAssignment.status == "In Progress"),
+    completed=Count(VehicleAssignment.status == "Completed"),
+)
+
+
 @router.get("/stats", response_model=dict)
 def get_assignment_stats(db: Session = Depends(get_db)):
     """Get vehicle assignment statistics"""
-    total = db.query(VehicleAssignment).count()
-    scheduled = db.query(VehicleAssignment).filter(
-        VehicleAssignment.status == "Scheduled"
-    ).count()
-    in_progress = db.query(VehicleAssignment).filter(
-        VehicleAssignment.status == "In Progress"
-    ).count()
-    completed = db.query(VehicleAssignment).filter(
-        VehicleAssignment.status == "Completed"
-    ).count()
-
-    return {
-        "total": total,
-        "scheduled": scheduled,
-        "in_progress": in_progress,
-        "completed": completed,
-    }
+    return assignment_stats.compute(db)
+
+
+assignment_types = ReferenceData("vehicle_assignments.assignment_types", VehicleAssignment.assignment_type)
 
 
 @router.get("/assignment-types", response_model=List[str])
-def get_assignment_types(db: Session = Depends(get_db)):
+def get_assignment_types(db: Session = Depends(get_primary_db)):
     """Get all unique assignment types"""
-    types = db.query(VehicleAssignment.assignment_type).distinct().filter(VehicleAssignment.assignment_type.isnot(None)).all()
-    return [t[0] for t in types if t[0]]
+    return assignment_types.values(db)
 
 
 @router.get("/{assignment_id}", response_model=VehicleAssignmentResponse)
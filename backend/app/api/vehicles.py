@@ -3,7 +3,15 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.conditional import Conditional
+from app.core.database import get_db, get_primary_db
+from app.core.entity_cache import entity_cache
+from app.core.fieldsets import Fieldset
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.reference_data import ReferenceData
+from app.core.search import apply_search
+from app.core.stats import StatsSpec, Count
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
 
@@ -29,13 +37,14 @@ def create_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
 @router.get("/", response_model=List[VehicleResponse])
 @router.get("", response_model=List[VehicleResponse])
 def get_vehicles(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     vehicle_type: Optional[str] = Query(None),
     branch: Optional[str] = Query(None),
     ownership: Optional[str] = Query(None),
+    fields: Fieldset = Depends(),
+    render: Renderer = Depends(),
     db: Session = Depends(get_db)
 ):
     """Get all vehicles with optional filters"""
@@ -43,12 +52,7 @@ def get_vehicles(
 
     # Apply filters
     if search:
-        query = query.filter(
-            (Vehicle.make.ilike(f"%{search}%")) |
-            (Vehicle.model.ilike(f"%{search}%")) |
-            (Vehicle.vin.ilike(f"%{search}%")) |
-            (Vehicle.license_plate.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, Vehicle, search)
 
     if status and status != "All Statuses":
         query = query.filter(Vehicle.status == status)
@@ -62,55 +66,49 @@ def get_vehicles(
     if ownership and ownership != "All Types":
         query = query.filter(Vehicle.ownership_type == ownership)
 
-    vehicles = query.order_by(Vehicle.make, Vehicle.model).offset(skip).limit(limit).all()
-    return vehicles
+    vehicles = page.paginate(fields.select(query, VehicleResponse), Vehicle.make, Vehicle.model)
+    return render.rows(vehicles, VehicleResponse, fields.names)
+
+
+vehicle_stats = StatsSpec(
+    Vehicle,
+    Vehicle.is_active == True,
+    total=Count(),
+    available=Count(Vehicle.status == "Available"),
+    in_use=Count(Vehicle.status == "In Use"),
+    maintenance=Count(Vehicle.status == "Maintenance"),
+)
 
 
 @router.get("/stats", response_model=dict)
 def get_vehicle_stats(db: Session = Depends(get_db)):
     """Get vehicle statistics"""
-    total = db.query(Vehicle).filter(Vehicle.is_active == True).count()
-    available = db.query(Vehicle).filter(
-        Vehicle.status == "Available",
-        Vehicle.is_active == True
-    ).count()
-    in_use = db.query(Vehicle).filter(
-        Vehicle.status == "In Use",
-        Vehicle.is_active == True
-    ).count()
-    maintenance = db.query(Vehicle).filter(
-        Vehicle.status == "Maintenance",
-        Vehicle.is_active == True
-    ).count()
-
-    return {
-        "total": total,
-        "available": available,
-        "in_use": in_use,
-        "maintenance": maintenance,
-    }
+    return vehicle_stats.compute(db)
+
+
+vehicle_types = ReferenceData("vehicles.vehicle_types", Vehicle.vehicle_type)
+vehicle_branches = ReferenceData("vehicles.branches", Vehicle.branch)
 
 
 @router.get("/vehicle-types", response_model=List[str])
-def get_vehicle_types(db: Session = Depends(get_db)):
+def get_vehicle_types(db: Session = Depends(get_primary_db)):
     """Get all unique vehicle types"""
-    types = db.query(Vehicle.vehicle_type).distinct().filter(Vehicle.vehicle_type.isnot(None)).all()
-    return [t[0] for t in types if t[0]]
+    return vehicle_types.values(db)
 
 
 @router.get("/branches", response_model=List[str])
-def get_branches(db: Session = Depends(get_db)):
+def get_branches(db: Session = Depends(get_primary_db)):
     """Get all unique branches"""
-    branches = db.query(Vehicle.branch).distinct().filter(Vehicle.branch.isnot(None)).all()
-    return [b[0] for b in branches if b[0]]
+    return vehicle_branches.values(db)
 
 
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
-def get_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
+def get_vehicle(vehicle_id: int, conditional: Conditional = Depends(), db: Session = Depends(get_primary_db)):
     """Get a specific vehicle by ID"""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    vehicle = entity_cache.get(Vehicle, vehicle_id) or entity_cache.load(db, Vehicle, vehicle_id, VehicleResponse)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
+    conditional.check(vehicle.updated_at or vehicle.created_at)
     return vehicle
 
 
@@ -5,6 +5,10 @@ from typing import List, Optional
 from decimal import Decimal
 
 from app.core.database import get_db
+from app.core.pagination import Pagination
+from app.core.rendering import Renderer
+from app.core.search import apply_search
+from app.core.stats import StatsSpec, Count, Sum
 from app.models.venue_booking import VenueBooking
 from app.models.case import Case
 from app.schemas.venue_booking import VenueBookingCreate, VenueBookingUpdate, VenueBookingResponse
@@ -31,11 +35,11 @@ def create_venue_booking(booking: VenueBookingCreate, db: Session = Depends(get_
 @router.get("/", response_model=List[dict])
 @router.get("", response_model=List[dict])
 def get_venue_bookings(
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination = Depends(),
     search: Optional[str] = Query(None),
     venue: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    render: Renderer = Depends(),
     db: Session = Depends(get_db)
 ):
     """Get all venue bookings with optional filters"""
@@ -43,12 +47,7 @@ def get_venue_bookings(
 
     # Apply filters
     if search:
-        query = query.join(Case).filter(
-            (Case.first_name.ilike(f"%{search}%")) |
-            (Case.last_name.ilike(f"%{search}%")) |
-            (Case.case_number.ilike(f"%{search}%")) |
-            (VenueBooking.contact_person.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, VenueBooking, search)
 
     if venue and venue != "All Venues":
         query = query.filter(VenueBooking.venue == venue)
@@ -56,7 +55,7 @@ def get_venue_bookings(
     if status and status != "All Statuses":
         query = query.filter(VenueBooking.status == status)
 
-    bookings = query.order_by(VenueBooking.booking_date.desc()).offset(skip).limit(limit).all()
+    bookings = page.paginate(query, VenueBooking.booking_date.desc())
 
     result = []
     for booking in bookings:
@@ -81,26 +80,22 @@ def get_venue_bookings(
             "updated_at": booking.updated_at,
         })
 
-    return result
+    return render.data(result)
+
+
+venue_booking_stats = StatsSpec(
+    VenueBooking,
+    total=Count(),
+    confirmed=Count(VenueBooking.status == "Confirmed"),
+    tentative=Count(VenueBooking.status == "Tentative"),
+    total_revenue=Sum(VenueBooking.cost),
+)
 
 
 @router.get("/stats", response_model=dict)
 def get_venue_booking_stats(db: Session = Depends(get_db)):
     """Get venue booking statistics"""
-    total = db.query(VenueBooking).count()
-    confirmed = db.query(VenueBooking).filter(VenueBooking.status == "Confirmed").count()
-    tentative = db.query(VenueBooking).filter(VenueBooking.status == "Tentative").count()
-
-    # Calculate total revenue
-    revenue_result = db.query(func.sum(VenueBooking.cost)).scalar()
-    total_revenue = float(revenue_result) if revenue_result else 0.00
-
-    return {
-        "total": total,
-        "confirmed": confirmed,
-        "tentative": tentative,
-        "total_revenue": total_revenue,
-    }
+    return venue_booking_stats.compute(db)
 
 
 @router.get("/{booking_id}", response_model=VenueBookingResponse)
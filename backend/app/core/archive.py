@@ -0,0 +1,105 @@
+"""Streaming ZIP archives.
+
+``zip_response`` writes the archive through ``zipfile`` into a sink that
+cannot seek, which makes ``zipfile`` emit data descriptors instead of going
+back to patch local headers. Whatever the sink has collected is yielded after
+every chunk, so neither the archive nor a whole member is ever held in memory
+or written to disk.
+"""
+import re
+import zipfile
+from contextlib import closing
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.core.storage import content_disposition
+
+CHUNK_SIZE = 1024 * 1024
+
+# (name in the archive, modification time, size in bytes, opener)
+ZipMember = Tuple[str, Optional[datetime], int, Callable[[], BinaryIO]]
+
+# Path separators, drive colons and control characters
+_UNSAFE = re.compile(r'[\\/:\x00-\x1f]')
+
+
+def safe_name(part: Optional[str], fallback: str) -> str:
+    """One folder or file name of a member, unable to climb out of its folder when extracted"""
+    cleaned = _UNSAFE.sub("_", part or "").strip()
+    if not cleaned.strip("."):
+        return fallback
+    return cleaned
+
+
+class _Sink:
+    """Write-only, unseekable file that hands out what was written to it"""
+
+    def __init__(self):
+        self.parts = []
+        self.offset = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Yield and forget everything written so far"""
+        if self.parts:
+            data = b"".join(self.parts)
+            self.parts = []
+            yield data
+
+
+def _unique(name: str, used: set) -> str:
+    """``name``, or ``name (2)``, ``name (3)``, ... if its folder already holds that name"""
+    folder, slash, filename = name.rpartition("/")
+    stem, dot, extension = filename.rpartition(".")
+    if not stem:
+        stem, dot, extension = filename, "", ""
+    candidate, number = name, 1
+    # Compared case-insensitively, as the archive may be extracted on Windows or macOS
+    while candidate.lower() in used:
+        number += 1
+        candidate = f"{folder}{slash}{stem} ({number}){dot}{extension}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def _zip_chunks(members: Iterable[ZipMember]):
+    sink = _Sink()
+    used = set()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, modified, size, opener in members:
+            try:
+                source = opener()
+            except FileNotFoundError:
+                continue
+            info = zipfile.ZipInfo(_unique(name, used), date_time=(modified or datetime.now()).timetuple()[:6])
+            with closing(source), archive.open(info, mode="w", force_zip64=size >= zipfile.ZIP64_LIMIT) as member:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    member.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def zip_response(members: Iterable[ZipMember], filename: str) -> StreamingResponse:
+    """Stream a ZIP of ``members``; files that no longer exist are left out.
+
+    Members are stored uncompressed: most documents (PDFs, images) are
+    already compressed, so deflating them would only cost CPU.
+    """
+    return StreamingResponse(
+        _zip_chunks(members),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(filename)},
+    )
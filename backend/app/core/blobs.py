@@ -0,0 +1,282 @@
+"""Content-addressed, deduplicated storage for document files.
+
+Every distinct file is stored once under the storage key
+``blobs/ab/cd/<sha256>``, and documents point at it through
+``Document.content_hash``. The ``blobs`` table
+counts the documents referencing each hash, plus the superseded
+document versions that are still stored whole. Mapper listeners adjust
+the count inside the flush that inserts, changes or removes a document
+or version, in the same way as the dashboard counters. Uploading a file that is already
+stored costs no extra disk space.
+
+A soft-deleted document keeps its reference, so it can still be restored
+with its file. ``python -m app.core.blobs gc`` deletes documents that were
+soft-deleted more than ``DOCUMENT_RETENTION_DAYS`` ago, which releases their
+references. It then removes blobs whose count dropped to zero, with their
+thumbnails and extracted text, and expires abandoned resumable uploads.
+``python -m app.core.blobs rebuild`` moves files uploaded before the blob
+store into it and recounts the references.
+"""
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.history import row_values, track
+from app.core.storage import INCOMING_DIR, LEGACY_FILES, get_storage
+from app.core.thumbnails import VARIANTS, variant_key
+from app.core.resumable import expire_sessions
+from app.core.schema import load_models
+from app.core.uploads import ReceivedFile, sha256_file
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.document_content import DocumentContent
+from app.models.document_version import DocumentVersion
+from app.models.upload_session import UploadSession
+
+BLOB_PREFIX = "blobs/"
+
+# Unreferenced blobs and stray files younger than this are kept, so an
+# upload that is still finishing never loses its file to a concurrent gc
+GC_GRACE = timedelta(hours=1)
+
+
+def blob_key(sha256: str) -> str:
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def document_file(document: Document):
+    """(storage, key) holding a document's bytes"""
+    if document.content_hash:
+        return get_storage(), blob_key(document.content_hash)
+    # Uploaded before the blob store and not yet moved by `blobs rebuild`
+    return LEGACY_FILES, document.file_path
+
+
+def place(received: ReceivedFile) -> str:
+    """Move an upload into the store, or drop it if the same content is already there.
+
+    Call after flushing the document that references it, so the blob row is
+    locked against a concurrent gc until the transaction commits.
+    """
+    storage = get_storage()
+    key = blob_key(received.sha256)
+    if storage.exists(key):
+        received.discard()
+    else:
+        storage.put_file(key, received.path)
+    return key
+
+
+def _document_reference(row):
+    # Soft-deleted documents hold their file until purge() deletes the row
+    if not row["content_hash"]:
+        return None
+    return row["content_hash"], row["file_size"] or 0
+
+
+def _version_reference(row):
+    # The current version's file is held by its document; superseded ones
+    # hold it themselves until they are stored as a delta
+    if row["superseded_at"] is None or row["delta_key"] or not row["content_hash"]:
+        return None
+    return row["content_hash"], row["file_size"] or 0
+
+
+# model -> (columns read, function returning the (hash, size) a row references or None)
+REFERENCES = {
+    Document: (("content_hash", "file_size"), _document_reference),
+    DocumentVersion: (("content_hash", "file_size", "superseded_at", "delta_key"), _version_reference),
+}
+
+
+def _reference(target, previous=False):
+    names, reference = REFERENCES[type(target)]
+    return reference(row_values(target, names, previous))
+
+
+def _adjust(connection, reference, delta):
+    if reference is None:
+        return
+    sha256, size = reference
+    table = Blob.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table).values(sha256=sha256, size=size, ref_count=max(delta, 0))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={"ref_count": table.c.ref_count + delta, "updated_at": func.now()},
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        update(table).where(table.c.sha256 == sha256).values(ref_count=table.c.ref_count + delta)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(sha256=sha256, size=size, ref_count=max(delta, 0)))
+
+
+def _after_insert(mapper, connection, target):
+    _adjust(connection, _reference(target), 1)
+
+
+def _after_update(mapper, connection, target):
+    old = _reference(target, previous=True)
+    new = _reference(target)
+    if old != new:
+        _adjust(connection, old, -1)
+        _adjust(connection, new, 1)
+
+
+def _after_delete(mapper, connection, target):
+    _adjust(connection, _reference(target, previous=True), -1)
+
+
+for _model in REFERENCES:
+    track(_model, REFERENCES[_model][0])
+    event.listen(_model, "after_insert", _after_insert)
+    event.listen(_model, "after_update", _after_update)
+    event.listen(_model, "after_delete", _after_delete)
+
+
+def rebuild(db: Session) -> int:
+    """Move pre-blob-store files into the store and recount references; returns files moved"""
+    storage = get_storage()
+    moved = 0
+    legacy = db.query(Document).filter(Document.content_hash.is_(None), Document.is_deleted == False)
+    for document in legacy.yield_per(100):
+        try:
+            source = LEGACY_FILES.path(document.file_path)
+        except FileNotFoundError:
+            continue
+        if not source.is_file():
+            continue
+        sha256 = sha256_file(source)
+        key = blob_key(sha256)
+        if storage.exists(key):
+            source.unlink()
+        else:
+            storage.put_file(key, source)
+        document.content_hash = sha256
+        document.file_path = key
+        moved += 1
+    db.flush()
+
+    counts = Counter(dict(
+        db.query(Document.content_hash, func.count())
+        .filter(Document.content_hash.isnot(None))
+        .group_by(Document.content_hash)
+    ))
+    counts.update(dict(
+        db.query(DocumentVersion.content_hash, func.count())
+        .filter(
+            DocumentVersion.content_hash.isnot(None),
+            DocumentVersion.superseded_at.isnot(None),
+            DocumentVersion.delta_key.is_(None)
+        )
+        .group_by(DocumentVersion.content_hash)
+    ))
+    sizes = dict(
+        db.query(Document.content_hash, func.max(Document.file_size))
+        .filter(Document.content_hash.isnot(None))
+        .group_by(Document.content_hash)
+    )
+    sizes.update(
+        db.query(DocumentVersion.content_hash, func.max(DocumentVersion.file_size))
+        .filter(DocumentVersion.content_hash.isnot(None))
+        .group_by(DocumentVersion.content_hash)
+    )
+    db.execute(delete(Blob))
+    db.add_all(
+        Blob(sha256=sha256, size=size or 0, ref_count=counts.get(sha256, 0))
+        for sha256, size in sizes.items()
+    )
+    db.commit()
+    return moved
+
+
+def purge(db: Session) -> int:
+    """Delete documents soft-deleted more than DOCUMENT_RETENTION_DAYS ago; returns documents deleted"""
+    if settings.DOCUMENT_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.DOCUMENT_RETENTION_DAYS)
+    # Documents deleted before deleted_at existed were last updated by the delete
+    deleted_at = func.coalesce(Document.deleted_at, Document.updated_at, Document.created_at)
+    expired = db.query(Document).filter(Document.is_deleted == True, deleted_at < cutoff).all()
+    for document in expired:
+        # Deleted through the ORM, so the listeners release the blob references
+        for version in db.query(DocumentVersion).filter(DocumentVersion.document_id == document.id):
+            db.delete(version)
+        db.query(UploadSession).filter(UploadSession.document_id == document.id).delete(synchronize_session=False)
+        db.flush()
+        db.delete(document)
+    db.commit()
+    return len(expired)
+
+
+def gc(db: Session) -> int:
+    """Purge expired documents, then delete unreferenced blobs and stray files older than GC_GRACE; returns files removed"""
+    storage = get_storage()
+    cutoff = datetime.now(timezone.utc) - GC_GRACE
+    purge(db)
+    removed = expire_sessions(db)
+
+    candidates = db.execute(
+        select(Blob.sha256).where(Blob.ref_count <= 0, Blob.updated_at < cutoff)
+    ).scalars().all()
+    for sha256 in candidates:
+        # Delete the row and the file in one transaction; an upload of the
+        # same content waits on the row lock and then stores the file afresh
+        deleted = db.execute(
+            delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0)
+        ).rowcount
+        if deleted:
+            db.execute(delete(DocumentContent).where(DocumentContent.content_hash == sha256))
+            storage.delete(blob_key(sha256))
+            for variant in VARIANTS:
+                storage.delete(variant_key(blob_key(sha256), variant))
+            removed += 1
+        db.commit()
+
+    known = set(db.execute(select(Blob.sha256)).scalars())
+    oldest = time.time() - GC_GRACE.total_seconds()
+    for key, modified in storage.list(BLOB_PREFIX):
+        # Thumbnails (<sha256>.<variant>.jpg) belong to the blob they are named after
+        if key.rsplit("/", 1)[-1].split(".")[0] not in known and modified < oldest:
+            storage.delete(key)
+            removed += 1
+    for path in INCOMING_DIR.glob("*.part"):
+        if path.stat().st_mtime < oldest:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] not in (["gc"], ["rebuild"]):
+        print("usage: python -m app.core.blobs gc|rebuild")
+        sys.exit(2)
+
+    load_models()
+    Blob.__table__.create(bind=engine, checkfirst=True)
+    UploadSession.__table__.create(bind=engine, checkfirst=True)
+    DocumentContent.__table__.create(bind=engine, checkfirst=True)
+    DocumentVersion.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        if sys.argv[1] == "rebuild":
+            print(f"Moved {rebuild(db)} file(s) into the blob store")
+        else:
+            print(f"Removed {gc(db)} file(s)")
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+"""Pub/sub channels that spread cache invalidations between API processes.
+
+A message is ``"<origin> <name>,<name>,..."``. Caches skip their own
+messages, and a name of ``ALL`` drops everything. ``RedisChannel`` delivers
+to every process subscribed to the same Redis server. ``LocalChannel`` is an
+in-process stand-in for tests.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Message meaning "drop everything", sent after a subscriber reconnects
+ALL = "*"
+RECONNECT_DELAY = 5
+
+
+class LocalChannel:
+    """In-process stand-in for the pub/sub channel; delivers to every subscriber in this process"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def publish(self, message: str):
+        for callback in list(self.subscribers):
+            callback(message)
+
+    def subscribe(self, callback: Callable[[str], None]):
+        self.subscribers.append(callback)
+
+
+class RedisChannel:
+    """Redis pub/sub channel shared by every API process"""
+
+    def __init__(self, url: str, channel: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_INVALIDATION_URL requires redis (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self.subscribers = []
+        self.listener = None
+
+    def publish(self, message: str):
+        try:
+            self.client.publish(self.channel, message)
+        except Exception:
+            logger.warning("Could not publish cache invalidation on %s", self.channel, exc_info=True)
+
+    def subscribe(self, callback: Callable[[str], None]):
+        self.subscribers.append(callback)
+        if self.listener is None:
+            self.listener = threading.Thread(target=self._listen, name=f"cache-invalidation-listener-{self.channel}", daemon=True)
+            self.listener.start()
+
+    def _deliver(self, message: str):
+        for callback in list(self.subscribers):
+            callback(message)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Invalidations published while disconnected are lost
+                self._deliver(f"- {ALL}")
+                for message in pubsub.listen():
+                    self._deliver(message["data"].decode())
+            except Exception:
+                logger.warning("Cache invalidation channel %s lost; reconnecting", self.channel, exc_info=True)
+                time.sleep(RECONNECT_DELAY)
+
+
+def invalidation_channel(name: str) -> Optional[RedisChannel]:
+    """The shared channel named ``name``, or None when CACHE_INVALIDATION_URL is not set"""
+    if settings.CACHE_INVALIDATION_URL:
+        return RedisChannel(settings.CACHE_INVALIDATION_URL, f"fdms:{name}")
+    return None
@@ -0,0 +1,100 @@
+"""Conditional GET support for list and detail endpoints.
+
+Clients poll lists such as tasks, follow-ups and schedules every few seconds,
+and most polls return what they already have. ``Conditional`` is a dependency
+that derives a validator from a cheap query before the rows are loaded:
+
+* a list: ``max(updated_at)``, ``count(*)`` and ``max(id)`` over the filtered
+  query, combined with the request's query string (filters and paging);
+* a record: its ``updated_at``.
+
+Rows that were never updated fall back to ``created_at``. Responses carry a
+weak ``ETag``, a ``Last-Modified`` and ``Cache-Control: private, no-cache``,
+so browsers revalidate on every request. When ``If-None-Match`` matches, the
+endpoint answers ``304 Not Modified`` before any row is read or serialized.
+
+``If-Modified-Since`` is honoured for records only, as deleting a row from a
+list leaves its newest timestamp unchanged. On SQLite, which stores
+timestamps in whole seconds, two updates within one second share a validator.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy.sql import func
+
+from app.core.storage import etag_matches
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _last_changed(model):
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps come from SQLite's CURRENT_TIMESTAMP, which is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class Conditional:
+    """Dependency answering conditional GETs from validators read ahead of the response"""
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def check_list(self, query):
+        """Validate a list response; returns the query, or raises a 304 when the client's copy is current"""
+        model = query.column_descriptions[0]["entity"]
+        newest, count, last_id = query.order_by(None).with_entities(
+            func.max(_last_changed(model)), func.count(model.id), func.max(model.id)
+        ).one()
+        self._validate(newest, f"{count}:{last_id}", modified_since=False)
+        return query
+
+    def check_record(self, query):
+        """Validate the single record ``query`` selects; returns the query, or raises a 304"""
+        model = query.column_descriptions[0]["entity"]
+        row = query.order_by(None).with_entities(_last_changed(model)).first()
+        if row is not None:
+            self._validate(row[0])
+        return query
+
+    def check(self, last_changed: Optional[datetime]):
+        """Validate a record already in hand, such as a cached response"""
+        self._validate(last_changed)
+
+    def _validate(self, last_changed: Optional[datetime], extra: str = "", modified_since: bool = True):
+        url = self.request.url
+        stamp = last_changed.isoformat() if last_changed else ""
+        digest = hashlib.sha1(f"{url.path}?{url.query}|{stamp}|{extra}".encode()).hexdigest()
+        headers = {"ETag": f'W/"{digest[:24]}"', "Cache-Control": CACHE_CONTROL}
+        if last_changed:
+            headers["Last-Modified"] = format_datetime(_utc(last_changed), usegmt=True)
+
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = etag_matches(if_none_match, headers["ETag"])
+        else:
+            fresh = modified_since and self._unmodified_since(last_changed)
+        if fresh:
+            raise HTTPException(status_code=304, headers=headers)
+        self.response.headers.update(headers)
+
+    def _unmodified_since(self, last_changed: Optional[datetime]) -> bool:
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if not if_modified_since or last_changed is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole seconds
+        return _utc(last_changed).replace(microsecond=0) <= since
@@ -15,7 +15,7 @@
 # settings = Settings()
 # app/core/config.py
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -24,6 +24,54 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
 
+    # Optional read replica; GET requests are served from it when set
+    DATABASE_REPLICA_URL: Optional[str] = None
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Per-statement timeout in milliseconds on PostgreSQL; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # Largest page a list endpoint will serve in one response
+    MAX_PAGE_SIZE: int = 1000
+
+    # Where uploaded files live: "local" (LOCAL_STORAGE_DIR on this node) or
+    # "s3" (any S3-compatible service; needs boto3)
+    STORAGE_BACKEND: str = "local"
+    LOCAL_STORAGE_DIR: str = "uploads"
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    # Files larger than this are uploaded in parts of S3_MULTIPART_CHUNK_MB
+    S3_MULTIPART_THRESHOLD_MB: int = 16
+    S3_MULTIPART_CHUNK_MB: int = 16
+    # Lifetime of the presigned URLs downloads are redirected to
+    S3_URL_EXPIRY_SECONDS: int = 300
+    # Soft-deleted documents keep their files this long, then `blobs gc`
+    # deletes them for good; 0 keeps them forever
+    DOCUMENT_RETENTION_DAYS: int = 30
+
+    # Processes rendering thumbnails and extracting document text in the
+    # background; 0 disables both
+    BACKGROUND_WORKERS: int = 2
+
+    # Dropdown values (vehicle types, branches, ...) are served from memory
+    # for up to this long; writes invalidate them sooner. 0 disables caching
+    REFERENCE_CACHE_TTL_SECONDS: int = 300
+    # Redis URL whose pub/sub spreads invalidations to every API process
+    CACHE_INVALIDATION_URL: Optional[str] = None
+    # Records served by GET /{id} routes kept in memory (least recently used
+    # evicted first) and for how long; 0 disables the cache
+    ENTITY_CACHE_MAX_ENTRIES: int = 5000
+    ENTITY_CACHE_TTL_SECONDS: int = 60
+
     class Config:
         env_file = ".env"
         case_sensitive = True
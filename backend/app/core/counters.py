@@ -0,0 +1,181 @@
+"""Incrementally maintained dashboard counters.
+
+Every tracked model contributes one ``(key, metrics)`` pair per row, where the
+key is ``(branch, status, bucket)`` and the metrics are ``(row_count, amount,
+balance)``. Mapper listeners add or subtract those contributions inside the
+flush that writes the row, so the ``dashboard_counters`` table always holds
+the per-branch, per-status totals and the ``/stats`` routes read a handful of
+summary rows instead of scanning history.
+
+Run ``python -m app.core.counters rebuild`` to reconcile the table with the
+source tables (after a bulk import or when enabling this on an existing
+database).
+"""
+import sys
+
+from sqlalchemy import delete, event, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.database import SessionLocal, engine
+from app.core.history import row_values, track
+from app.core.stats import StatsSpec
+from app.models.dashboard_counter import DashboardCounter
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.expense import Expense
+from app.models.transaction import Transaction
+from app.models.task import Task
+from app.models.followup import Followup
+from app.models.family import Family
+
+KEY_COLUMNS = ("entity", "branch", "status", "bucket")
+METRIC_COLUMNS = ("row_count", "amount", "balance")
+
+
+def _invoice(row):
+    open_balance = max(row["balance"] or 0.0, 0.0)
+    bucket = str(row["due_date"]) if open_balance > 0 and row["due_date"] else ""
+    return (row["branch"], row["status"], bucket), (1, row["total_amount"] or 0.0, open_balance)
+
+
+def _payment(row):
+    return (None, row["status"], ""), (1, row["amount"] or 0.0, 0.0)
+
+
+def _expense(row):
+    return (row["branch"], row["status"], ""), (1, row["amount"] or 0.0, 0.0)
+
+
+def _transaction(row):
+    return (row["branch"], row["transaction_type"], ""), (1, row["amount"] or 0.0, 0.0)
+
+
+def _task(row):
+    return (row["branch"], row["status"], ""), (1, 0.0, 0.0)
+
+
+def _followup(row):
+    return (None, row["status"], ""), (1, 0.0, 0.0)
+
+
+def _family(row):
+    return (None, row["status"], ""), (1, row["lifetime_value"] or 0.0, 0.0)
+
+
+# model -> (entity name, attributes read, contribution function)
+SOURCES = {
+    Invoice: ("invoices", ("branch", "status", "due_date", "total_amount", "balance"), _invoice),
+    Payment: ("payments", ("status", "amount"), _payment),
+    Expense: ("expenses", ("branch", "status", "amount"), _expense),
+    Transaction: ("transactions", ("branch", "transaction_type", "amount"), _transaction),
+    Task: ("tasks", ("branch", "status"), _task),
+    Followup: ("followups", ("status",), _followup),
+    Family: ("families", ("status", "lifetime_value"), _family),
+}
+
+
+def counter_stats(entity: str, **fields) -> StatsSpec:
+    """Stats spec reading the summary rows of one entity"""
+    return StatsSpec(DashboardCounter, DashboardCounter.entity == entity, **fields)
+
+
+def _normalize(entity, key):
+    branch, status, bucket = key
+    return (entity, branch or "", status or "", bucket or "")
+
+
+def _apply(connection, key, metrics, sign=1):
+    if not any(metrics):
+        return
+    deltas = {name: sign * value for name, value in zip(METRIC_COLUMNS, metrics)}
+    table = DashboardCounter.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table).values(**dict(zip(KEY_COLUMNS, key)), **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                **{name: table.c[name] + stmt.excluded[name] for name in METRIC_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(*[table.c[name] == value for name, value in zip(KEY_COLUMNS, key)])
+        .values(**{name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**dict(zip(KEY_COLUMNS, key)), **deltas))
+
+
+def _after_insert(mapper, connection, target):
+    entity, attributes, contribute = SOURCES[mapper.class_]
+    key, metrics = contribute(row_values(target, attributes))
+    _apply(connection, _normalize(entity, key), metrics)
+
+
+def _after_update(mapper, connection, target):
+    entity, attributes, contribute = SOURCES[mapper.class_]
+    old_key, old_metrics = contribute(row_values(target, attributes, previous=True))
+    new_key, new_metrics = contribute(row_values(target, attributes))
+    old_key, new_key = _normalize(entity, old_key), _normalize(entity, new_key)
+
+    if old_key == new_key:
+        _apply(connection, new_key, [new - old for new, old in zip(new_metrics, old_metrics)])
+    else:
+        _apply(connection, old_key, old_metrics, sign=-1)
+        _apply(connection, new_key, new_metrics)
+
+
+def _after_delete(mapper, connection, target):
+    entity, attributes, contribute = SOURCES[mapper.class_]
+    key, metrics = contribute(row_values(target, attributes, previous=True))
+    _apply(connection, _normalize(entity, key), metrics, sign=-1)
+
+
+for _model in SOURCES:
+    track(_model, SOURCES[_model][1])
+    event.listen(_model, "after_insert", _after_insert)
+    event.listen(_model, "after_update", _after_update)
+    event.listen(_model, "after_delete", _after_delete)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every counter from the source tables; returns the number of rows written"""
+    totals = {}
+    for model, (entity, attributes, contribute) in SOURCES.items():
+        columns = [getattr(model, name) for name in attributes]
+        for row in db.query(*columns).yield_per(1000):
+            key, metrics = contribute(dict(zip(attributes, row)))
+            key = _normalize(entity, key)
+            current = totals.get(key, (0, 0.0, 0.0))
+            totals[key] = tuple(a + b for a, b in zip(current, metrics))
+
+    db.execute(delete(DashboardCounter))
+    db.add_all(
+        DashboardCounter(**dict(zip(KEY_COLUMNS, key)), **dict(zip(METRIC_COLUMNS, metrics)))
+        for key, metrics in totals.items()
+    )
+    db.commit()
+    return len(totals)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("usage: python -m app.core.counters rebuild")
+        sys.exit(2)
+
+    DashboardCounter.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        written = rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt dashboard counters: {written} rows")
@@ -1,17 +1,133 @@
+from contextlib import asynccontextmanager
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+# Async drivers by backend; databases without one stay on the sync engine
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg"}
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool and connection settings for an engine on the given database"""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # SQLite connections are cheap and file-local; keep SQLAlchemy's defaults
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _async_engine(url: str):
+    """Async engine for the database, or None when it has no async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return None
+    return create_async_engine(parsed.set(drivername=driver), **_engine_options(url, is_async=True))
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Reads go to the replica when one is configured, otherwise to the primary
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL, **_engine_options(settings.DATABASE_REPLICA_URL)
+    )
+else:
+    replica_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+async_engine = _async_engine(settings.DATABASE_URL)
+if async_engine is not None and settings.DATABASE_REPLICA_URL:
+    async_replica_engine = _async_engine(settings.DATABASE_REPLICA_URL)
+else:
+    async_replica_engine = async_engine
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
+    """Request-scoped session; GET and HEAD requests are served by the read replica"""
+    factory = ReadSessionLocal if request.method in READ_ONLY_METHODS else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_primary_db():
+    """get_db on the primary for every method, for reads that must see the latest commit"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class AsyncDB:
+    """Session handle for ``async def`` handlers.
+
+    ``run(fn, ...)`` calls ``fn(session, ...)`` with a regular ORM session, so
+    query helpers are shared with the sync routes. On PostgreSQL the session
+    is an ``AsyncSession`` and its I/O is awaited on the event loop; databases
+    without an async driver (SQLite in development) run ``fn`` on the
+    threadpool with a sync session instead.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+@asynccontextmanager
+async def _async_db(read_only: bool):
+    if async_engine is None:
+        db = (ReadSessionLocal if read_only else SessionLocal)()
+        try:
+            yield AsyncDB(db)
+        finally:
+            await run_in_threadpool(db.close)
+        return
+
+    async with (AsyncReadSessionLocal if read_only else AsyncSessionLocal)() as session:
+        yield AsyncDB(session)
+
+
+async def get_async_db(request: Request):
+    """Async counterpart of get_db with the same read-replica routing"""
+    async with _async_db(request.method in READ_ONLY_METHODS) as db:
+        yield db
+
+
+async def get_async_primary_db():
+    """get_async_db on the primary for every method, for reads that must see the latest commit"""
+    async with _async_db(read_only=False) as db:
+        yield db
@@ -0,0 +1,82 @@
+"""Binary deltas between two versions of a text-like file.
+
+A delta rebuilds ``target`` from ``base``. It is a zlib-compressed list of
+operations: copy a byte range of ``base``, or insert literal bytes. ``diff``
+works line by line and greedily reuses runs of lines that ``base`` also
+contains. It runs in linear time, which is enough for the small, local edits
+between revisions of a contract.
+"""
+import struct
+import zlib
+
+MAGIC = b"FDMSD1"
+_COPY = b"C"
+_INSERT = b"I"
+_RANGE = struct.Struct(">QQ")
+_LENGTH = struct.Struct(">Q")
+
+
+def diff(base: bytes, target: bytes) -> bytes:
+    """Delta that turns ``base`` into ``target``"""
+    base_lines = base.splitlines(keepends=True)
+    starts = [0]
+    for line in base_lines:
+        starts.append(starts[-1] + len(line))
+    first_seen = {}
+    for number, line in enumerate(base_lines):
+        first_seen.setdefault(line, number)
+
+    ops = []
+    pending = []
+    target_lines = target.splitlines(keepends=True)
+    resume = None  # base line after the last copied run
+    j = 0
+    while j < len(target_lines):
+        line = target_lines[j]
+        # Prefer continuing where the last run stopped, so repeated lines
+        # (blank lines, boilerplate) do not break runs apart
+        if resume is not None and resume < len(base_lines) and base_lines[resume] == line:
+            i = resume
+        else:
+            i = first_seen.get(line)
+        if i is None:
+            pending.append(line)
+            j += 1
+            continue
+
+        start = i
+        while j < len(target_lines) and i < len(base_lines) and base_lines[i] == target_lines[j]:
+            i += 1
+            j += 1
+        if pending:
+            ops.append(_INSERT + _LENGTH.pack(sum(map(len, pending))) + b"".join(pending))
+            pending = []
+        ops.append(_COPY + _RANGE.pack(starts[start], starts[i] - starts[start]))
+        resume = i
+    if pending:
+        ops.append(_INSERT + _LENGTH.pack(sum(map(len, pending))) + b"".join(pending))
+    return zlib.compress(MAGIC + b"".join(ops), 9)
+
+
+def patch(base: bytes, delta: bytes) -> bytes:
+    """Apply a delta made by ``diff`` to ``base``"""
+    data = zlib.decompress(delta)
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a document delta")
+    out = []
+    position = len(MAGIC)
+    while position < len(data):
+        op = data[position:position + 1]
+        position += 1
+        if op == _COPY:
+            offset, length = _RANGE.unpack_from(data, position)
+            position += _RANGE.size
+            out.append(base[offset:offset + length])
+        elif op == _INSERT:
+            (length,) = _LENGTH.unpack_from(data, position)
+            position += _LENGTH.size
+            out.append(data[position:position + length])
+            position += length
+        else:
+            raise ValueError("Corrupt document delta")
+    return b"".join(out)
@@ -0,0 +1,188 @@
+"""Read-through cache for single records served by ``GET /{id}`` routes.
+
+Several components of a page often fetch the same case, invoice or vehicle.
+``entity_cache`` keeps the validated response of each recently read record
+in memory. Entries are keyed on ``(model, id)`` and tagged with the row's
+``updated_at``, and a cache hit costs no database round trip. The cache holds
+at most ``ENTITY_CACHE_MAX_ENTRIES`` records and evicts the least recently
+used one first. An entry also expires after ``ENTITY_CACHE_TTL_SECONDS``.
+
+Writes invalidate entries as they happen. A session listener notes the cached
+rows a flush updates or deletes, and drops them once the transaction commits.
+Bulk ``query.update()`` and ``query.delete()`` calls drop every entry of
+their model. With ``CACHE_INVALIDATION_URL`` set, the invalidations also
+reach the other API processes. Without it, other processes keep serving
+their copy of a changed record until its TTL runs out.
+
+Routes fill the cache through a primary session (``get_primary_db``), not
+the read replica. Otherwise a replica that has not caught up yet could load
+the row as it was before the write that just invalidated it.
+
+Hit, miss and eviction counters are served at ``/health/cache`` for tuning
+the size and TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Type
+from uuid import uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.channels import ALL, invalidation_channel
+from app.core.config import settings
+from app.models.case import Case
+from app.models.document import Document
+from app.models.invoice import Invoice
+from app.models.staff import Staff
+from app.models.vehicle import Vehicle
+
+# Models whose records are cached; writes to them are watched in every process
+CACHED_MODELS = {model.__name__: model for model in (Case, Document, Invoice, Staff, Vehicle)}
+
+# Session.info key of the entries a transaction has changed
+_PENDING = "entity_cache_pending"
+
+
+class EntityCache:
+    """LRU map of (model, id) -> (updated_at, expiry, response)"""
+
+    def __init__(self, max_entries: int, ttl: float, channel=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.channel = channel
+        self.entries = OrderedDict()
+        # Bumped by every invalidation, so a load that raced with one is not kept
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.origin = uuid4().hex
+        if channel is not None:
+            channel.subscribe(self._received)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, model, entity_id: int) -> Optional[BaseModel]:
+        """The cached response for a record, or None on a miss"""
+        key = (model.__name__, entity_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+        return None
+
+    def load(self, db: Session, model, entity_id: int, schema: Type[BaseModel], *conditions) -> Optional[BaseModel]:
+        """Read a record matching all conditions into the cache; None if there is none"""
+        generation = self.generation
+        row = db.query(model).filter(model.id == entity_id, *conditions).first()
+        if row is None:
+            return None
+        response = schema.model_validate(row)
+        if self.enabled:
+            self._store(model, entity_id, row.updated_at or row.created_at, response, generation)
+        return response
+
+    def _store(self, model, entity_id, version, response, generation):
+        key = (model.__name__, entity_id)
+        with self.lock:
+            if generation != self.generation:
+                return
+            current = self.entries.get(key)
+            # Of two loads finishing out of order, keep the newer row
+            if current is not None and current[0] and version and current[0] > version:
+                return
+            self.entries[key] = (version, time.monotonic() + self.ttl, response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def drop(self, keys):
+        """Drop entries by ``Model:id``, ``Model:*`` or ``*``"""
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                name, _, entity_id = key.partition(":")
+                if key == ALL:
+                    removed = list(self.entries)
+                elif entity_id == ALL:
+                    removed = [cached for cached in self.entries if cached[0] == name]
+                else:
+                    removed = [(name, int(entity_id))] if (name, int(entity_id)) in self.entries else []
+                for cached in removed:
+                    del self.entries[cached]
+                self.invalidations += len(removed)
+
+    def invalidate(self, *keys: str):
+        """Drop entries here and in every process listening on the channel"""
+        self.drop(keys)
+        if self.channel is not None:
+            self.channel.publish(f"{self.origin} {','.join(keys)}")
+
+    def _received(self, message: str):
+        origin, _, keys = message.partition(" ")
+        if origin != self.origin:
+            self.drop(keys.split(","))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+entity_cache = EntityCache(
+    settings.ENTITY_CACHE_MAX_ENTRIES,
+    settings.ENTITY_CACHE_TTL_SECONDS,
+    channel=invalidation_channel("entities"),
+)
+
+
+def _pending(session) -> set:
+    return session.info.setdefault(_PENDING, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    for target in session.dirty | session.deleted:
+        name = type(target).__name__
+        if name in CACHED_MODELS:
+            _pending(session).add(f"{name}:{target.id}")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_.__name__ in CACHED_MODELS:
+            _pending(orm_execute_state.session).add(f"{mapper.class_.__name__}:{ALL}")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate(session):
+    keys = session.info.pop(_PENDING, None)
+    if keys:
+        entity_cache.invalidate(*sorted(keys))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING, None)
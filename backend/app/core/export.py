@@ -0,0 +1,80 @@
+"""Streaming exports of large collections.
+
+Rows are read through a server-side cursor (``yield_per``) and written to the
+response one batch at a time, so memory use stays constant regardless of how
+many rows the export contains.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi.responses import StreamingResponse
+
+from app.core.database import ReadSessionLocal
+
+EXPORT_FORMATS = "^(ndjson|csv)$"
+BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _ndjson(names, rows):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(dict(zip(names, row)), default=_json_default))
+        if len(buffer) == BATCH_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _csv(names, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_response(model, build_query, fmt: str, filename: str) -> StreamingResponse:
+    """Stream every row of ``build_query(db)`` as NDJSON or CSV.
+
+    ``build_query`` receives a dedicated session that lives as long as the
+    response body is being sent and must return a query over ``model``.
+    """
+    columns = list(model.__table__.columns)
+    names = [column.key for column in columns]
+
+    def generate():
+        db = ReadSessionLocal()
+        try:
+            query = build_query(db).with_entities(*columns).yield_per(BATCH_SIZE)
+            writer = _csv if fmt == "csv" else _ndjson
+            yield from writer(names, query)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
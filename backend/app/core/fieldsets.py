@@ -0,0 +1,48 @@
+"""Sparse fieldsets for list endpoints.
+
+``fields=id,first_name,date_of_death`` asks a list endpoint for just those
+fields of each row. ``Fieldset`` checks the names against the response
+schema and narrows the SELECT to the matching columns with ``load_only``.
+``Renderer.rows`` then writes out only those fields. ``id`` is always
+included, and the fields keep the schema's order.
+
+Fields that are not columns, such as ``thumbnail_url``, are computed from
+the row. Asking for one of them loads whole rows, though the response is
+still trimmed.
+"""
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+
+class Fieldset:
+    """Dependency carrying the ``fields`` parameter of a list request"""
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,first_name"),
+    ):
+        self.requested = {name.strip() for name in fields.split(",") if name.strip()} if fields else set()
+        # Fields to render, in schema order; None renders them all
+        self.names: Optional[Tuple[str, ...]] = None
+
+    def select(self, query, schema: Type[BaseModel]):
+        """Restrict the query to the columns behind the requested fields of ``schema``"""
+        if not self.requested:
+            return query
+        unknown = self.requested - set(schema.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                       f"Available: {', '.join(schema.model_fields)}"
+            )
+        self.names = tuple(name for name in schema.model_fields if name in self.requested or name == "id")
+
+        model = query.column_descriptions[0]["entity"]
+        columns = model.__mapper__.column_attrs
+        if all(name in columns for name in self.names):
+            query = query.options(load_only(*[getattr(model, name) for name in self.names]))
+        return query
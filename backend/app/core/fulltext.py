@@ -0,0 +1,319 @@
+"""Full-text search over the contents of uploaded documents.
+
+Once an upload has committed, ``schedule`` hands the stored file to the
+background worker pool. The workers pull the plain text out of PDF, DOCX and
+text files, using pure-Python parsers only, and the result is saved as a
+``DocumentContent`` row keyed by the content hash. Duplicate uploads share
+that row, so their text is extracted only once. Parsers read the stored file
+in place rather than loading it into memory, and files over
+``MAX_FILE_SIZE`` are not indexed.
+
+The text is indexed by the database:
+
+* PostgreSQL: a generated ``tsvector`` column with a GIN index. The term is
+  parsed with ``websearch_to_tsquery``, hits are ranked by ``ts_rank_cd``
+  and snippets come from ``ts_headline``.
+* SQLite: an FTS5 table using the porter tokenizer, kept in sync by
+  triggers. Every word of the term must match; hits are ranked by bm25 and
+  snippets come from ``snippet()``.
+* Other databases: an unindexed, unranked ``LIKE`` scan for every word of
+  the term, with snippets cut around the first match.
+
+Snippets are HTML-escaped, and the matched words are wrapped in ``<mark>``.
+
+PDFs need ``pip install pypdf``. Run ``python -m app.core.fulltext backfill``
+to extract the text of files stored before this existed, or of PDFs stored
+while pypdf was missing. The index is created along with the table, by
+``create_all`` or ``python -m app.core.schema``.
+"""
+import html
+import logging
+import sys
+import zipfile
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from xml.etree import ElementTree
+
+from sqlalchemy import DDL, and_, column, event, false, literal, literal_column, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core import workers
+from app.core.database import SessionLocal
+from app.core.storage import get_storage
+from app.models.document_content import DocumentContent
+
+logger = logging.getLogger(__name__)
+
+# file type -> parser
+TEXT_TYPES = {"TXT", "CSV", "MD", "LOG"}
+KINDS = {"PDF": "pdf", "DOCX": "docx", **{file_type: "text" for file_type in TEXT_TYPES}}
+
+# Larger files are not indexed, so one huge upload cannot tie up a worker
+MAX_FILE_SIZE = 100 * 1024 * 1024
+# Longer texts are cut off; PostgreSQL refuses tsvectors over 1 MB
+MAX_TEXT_CHARS = 500_000
+# Refuse DOCX bodies that inflate beyond this
+MAX_DOCX_XML = 64 * 1024 * 1024
+
+FTS = "document_contents_fts"
+LANGUAGE = "english"
+# Placeholders wrapped around matches by the database, replaced after escaping
+_START, _STOP = "\x02", "\x03"
+# Characters of context on each side of the match in LIKE-scan snippets
+SNIPPET_CONTEXT = 80
+
+_fts_ddl = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS} USING fts5("
+    f"text, content='document_contents', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS}_ai AFTER INSERT ON document_contents BEGIN "
+    f"INSERT INTO {FTS}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS}_ad AFTER DELETE ON document_contents BEGIN "
+    f"INSERT INTO {FTS}({FTS}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS}_au AFTER UPDATE ON document_contents BEGIN "
+    f"INSERT INTO {FTS}({FTS}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS}(rowid, text) VALUES (new.id, new.text); END",
+]
+_tsvector_ddl = [
+    f"ALTER TABLE document_contents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{LANGUAGE}'::regconfig, text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_document_contents_search_vector "
+    "ON document_contents USING gin (search_vector)",
+]
+
+for _statement in _fts_ddl:
+    event.listen(DocumentContent.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in _tsvector_ddl:
+    event.listen(DocumentContent.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+_fts = table(FTS, column("rowid"), column("rank"))
+_search_vector = literal_column("document_contents.search_vector")
+_config = literal_column(f"'{LANGUAGE}'::regconfig")
+
+
+def kind_of(file_type: Optional[str]) -> Optional[str]:
+    """'pdf', 'docx', 'text' or None for files whose text is not extracted"""
+    return KINDS.get((file_type or "").upper())
+
+
+def _pdf_text(path: Path) -> str:
+    from pypdf import PdfReader
+
+    pages = []
+    length = 0
+    # Given a path, PdfReader would read the whole file into memory first
+    with open(path, "rb") as file:
+        for page in PdfReader(file).pages:
+            pages.append(page.extract_text() or "")
+            length += len(pages[-1])
+            if length >= MAX_TEXT_CHARS:
+                break
+    return "\n".join(pages)
+
+
+def _docx_text(path: Path) -> str:
+    word = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    with zipfile.ZipFile(path) as archive:
+        if archive.getinfo("word/document.xml").file_size > MAX_DOCX_XML:
+            raise ValueError("word/document.xml is too large")
+        parts = []
+        with archive.open("word/document.xml") as body:
+            for _, element in ElementTree.iterparse(body):
+                if element.tag == f"{word}t":
+                    parts.append(element.text or "")
+                elif element.tag == f"{word}tab":
+                    parts.append("\t")
+                elif element.tag in (f"{word}br", f"{word}cr", f"{word}p"):
+                    parts.append("\n")
+                    if element.tag == f"{word}p":
+                        element.clear()
+    return "".join(parts)
+
+
+def _plain_text(path: Path) -> str:
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            return file.read(MAX_TEXT_CHARS)
+    except UnicodeDecodeError:
+        with open(path, encoding="cp1252", errors="replace", newline="") as file:
+            return file.read(MAX_TEXT_CHARS)
+
+
+PARSERS = {"pdf": _pdf_text, "docx": _docx_text, "text": _plain_text}
+
+
+def extract(key: str, kind: str) -> Optional[str]:
+    """Text of the stored file ``key``; runs in a worker process.
+
+    Returns "" for files that cannot be parsed and None when a parser is
+    missing, so a backfill tries those again.
+    """
+    storage = get_storage()
+    try:
+        if storage.size(key) > MAX_FILE_SIZE:
+            logger.warning("Not extracting text from %s; the file is over %d bytes", key, MAX_FILE_SIZE)
+            return ""
+        with storage.local_path(key) as path:
+            extracted = PARSERS[kind](path)
+    except ImportError:
+        logger.warning("Extracting text from PDFs needs pypdf; skipping %s", key)
+        return None
+    except Exception:
+        logger.exception("Could not extract text from %s", key)
+        return ""
+    # PostgreSQL text columns cannot hold NUL
+    return extracted[:MAX_TEXT_CHARS].replace("\x00", "")
+
+
+def _save(content_hash: str, extracted: Optional[str]):
+    if extracted is None:
+        return
+    db = SessionLocal()
+    try:
+        values = {"content_hash": content_hash, "text": extracted}
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = (postgresql if dialect == "postgresql" else sqlite).insert
+            db.execute(insert(DocumentContent).values(**values).on_conflict_do_nothing(
+                index_elements=[DocumentContent.content_hash]
+            ))
+        else:
+            db.add(DocumentContent(**values))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def schedule(key: str, file_type: Optional[str], content_hash: str):
+    """Extract the text of ``key`` in the background and index it under ``content_hash``"""
+    kind = kind_of(file_type)
+    if kind is not None:
+        try:
+            workers.submit(extract, key, kind, callback=partial(_save, content_hash))
+        except Exception:
+            # The upload is already committed; backfill indexes what was missed
+            logger.exception("Could not schedule text extraction for %s", key)
+
+
+def _match_term(term: str, dialect: str):
+    if dialect == "postgresql":
+        return func.websearch_to_tsquery(_config, term)
+    # Quote every word so FTS5 operators in the term are matched literally
+    return " ".join('"' + word.replace('"', '""') + '"' for word in term.split())
+
+
+def _matches(term: str, dialect: str):
+    """SELECT of (content_hash, score) for the texts matching the term; higher scores rank first"""
+    if dialect == "postgresql":
+        query = _match_term(term, dialect)
+        return select(
+            DocumentContent.content_hash.label("content_hash"),
+            func.ts_rank_cd(_search_vector, query).label("score"),
+        ).where(_search_vector.op("@@")(query))
+    if dialect == "sqlite":
+        return select(
+            DocumentContent.content_hash.label("content_hash"),
+            (-_fts.c.rank).label("score"),
+        ).join(_fts, _fts.c.rowid == DocumentContent.id).where(
+            text(f"{FTS} MATCH :term").bindparams(term=_match_term(term, dialect))
+        )
+    return select(DocumentContent.content_hash.label("content_hash"), literal(0.0).label("score")).where(
+        and_(*[DocumentContent.text.ilike(f"%{word}%") for word in term.split()])
+    )
+
+
+def apply_content_search(query, model, term: str):
+    """Restrict the query to documents whose contents match ``term``, best matches first"""
+    dialect = query.session.get_bind().dialect.name
+    if not term.strip():
+        return query.filter(false())
+    matches = _matches(term, dialect).subquery()
+    query = query.join(matches, matches.c.content_hash == model.content_hash)
+    return query.order_by(matches.c.score.desc())
+
+
+def snippets(db: Session, term: str, content_hashes: Iterable[str]) -> Dict[str, str]:
+    """content_hash -> passage around the matches of ``term``, for the given contents"""
+    content_hashes = [h for h in set(content_hashes) if h]
+    if not content_hashes or not term.strip():
+        return {}
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        rows = db.execute(select(DocumentContent.content_hash, DocumentContent.text).where(
+            DocumentContent.content_hash.in_(content_hashes)
+        ))
+        return {content_hash: _like_snippet(text_, term) for content_hash, text_ in rows}
+    if dialect == "postgresql":
+        options = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords=20, MinWords=8"
+        snippet = func.ts_headline(_config, DocumentContent.text, _match_term(term, dialect), options)
+        query = select(DocumentContent.content_hash, snippet)
+    else:
+        snippet = func.snippet(literal_column(FTS), 0, _START, _STOP, "…", 24)
+        query = select(DocumentContent.content_hash, snippet).join(
+            _fts, _fts.c.rowid == DocumentContent.id
+        ).where(text(f"{FTS} MATCH :term").bindparams(term=_match_term(term, dialect)))
+    rows = db.execute(query.where(DocumentContent.content_hash.in_(content_hashes)))
+    return {
+        content_hash: html.escape(passage).replace(_START, "<mark>").replace(_STOP, "</mark>")
+        for content_hash, passage in rows
+    }
+
+
+def _like_snippet(text_: str, term: str) -> str:
+    """Passage around the first word of ``term`` found in ``text_``, escaped like the database snippets"""
+    lowered = text_.lower()
+    found = [(lowered.find(word.lower()), word) for word in term.split()]
+    found = [(position, word) for position, word in found if position >= 0]
+    if not found:
+        return ""
+    position, word = min(found)
+    start = max(position - SNIPPET_CONTEXT, 0)
+    end = min(position + len(word) + SNIPPET_CONTEXT, len(text_))
+    return "".join((
+        "…" if start else "",
+        html.escape(text_[start:position]),
+        "<mark>", html.escape(text_[position:position + len(word)]), "</mark>",
+        html.escape(text_[position + len(word):end]),
+        "…" if end < len(text_) else "",
+    ))
+
+
+def backfill() -> int:
+    """Extract the text of stored documents that have none yet; returns files extracted"""
+    from app.core.blobs import blob_key
+    from app.core.schema import load_models
+    from app.models.document import Document
+
+    load_models()
+    db = SessionLocal()
+    try:
+        documents = db.query(Document.content_hash, Document.file_type).outerjoin(
+            DocumentContent, DocumentContent.content_hash == Document.content_hash
+        ).filter(
+            Document.content_hash.isnot(None),
+            DocumentContent.id.is_(None),
+            Document.is_deleted == False
+        ).distinct().all()
+    finally:
+        db.close()
+
+    jobs = {}
+    for content_hash, file_type in documents:
+        if kind_of(file_type):
+            jobs.setdefault(content_hash, kind_of(file_type))
+    results = workers.run_all(extract, [blob_key(h) for h in jobs], list(jobs.values()))
+    for content_hash, extracted in zip(jobs, results):
+        _save(content_hash, extracted)
+    return sum(extracted is not None for extracted in results)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python -m app.core.fulltext backfill")
+        sys.exit(2)
+    print(f"Extracted text from {backfill()} file(s)")
@@ -0,0 +1,52 @@
+"""Attribute history of objects being flushed, for mapper listeners.
+
+Listeners that compare a row before and after a flush register its
+attributes with ``track``. Replacing an expired attribute (after a commit,
+say) then loads the old value first, and ``before_flush`` loads any tracked
+attribute that is still unloaded on a changed or deleted object. Without
+that, ``row_values`` would see None where the old value should be.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# model -> names of the attributes listeners read
+_tracked = {}
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def track(model, attributes: Iterable[str]):
+    """Make the previous values of ``attributes`` available to row_values in every flush"""
+    for name in attributes:
+        event.listen(getattr(model, name), "set", _keep_old_value, active_history=True, retval=True)
+    _tracked.setdefault(model, set()).update(attributes)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_tracked(session, flush_context, instances):
+    for target in session.dirty | session.deleted:
+        names = _tracked.get(type(target))
+        if names:
+            for name in inspect(target).unloaded & names:
+                getattr(target, name)
+
+
+def row_values(target, attributes: Iterable[str], previous: bool = False) -> Dict[str, object]:
+    """Attribute values of a flushed object, before or after the flush"""
+    state = inspect(target)
+    values = {}
+    for name in attributes:
+        history = state.attrs[name].history
+        if previous and history.deleted:
+            values[name] = history.deleted[0]
+        elif not previous and history.added:
+            values[name] = history.added[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = None
+    return values
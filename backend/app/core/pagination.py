@@ -0,0 +1,186 @@
+"""Shared paging contract for list endpoints.
+
+Lists page with ``skip``/``limit`` by default. Passing ``cursor`` switches to
+keyset mode: rows are ordered by the endpoint's sort columns plus ``id`` as a
+tie-breaker, the page seeks past the previous page's last row instead of
+counting over skipped rows, and the opaque cursor for the following page is
+returned in the ``X-Next-Cursor`` header (absent on the last page). Send an
+empty ``cursor=`` to request the first keyset page. Any ordering already on
+the query (such as search ranking) is replaced by the keyset order.
+
+Pages are capped at ``settings.MAX_PAGE_SIZE`` rows. Passing ``count=exact``
+or ``count=estimated`` adds an ``X-Total-Count`` header with the size of the
+whole filtered result; the estimate comes from the PostgreSQL planner and
+costs no table scan (other databases fall back to an exact count).
+
+Seek columns are expected to be non-null.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import undefer
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, UnaryExpression
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _sort_keys(query, order_by):
+    """(column, descending) pairs for the ORDER BY, always ending with the primary key"""
+    keys = []
+    for clause in order_by:
+        if isinstance(clause, UnaryExpression) and clause.modifier in (operators.desc_op, operators.asc_op):
+            keys.append((clause.element, clause.modifier is operators.desc_op))
+        else:
+            keys.append((clause, False))
+
+    model = query.column_descriptions[0]["entity"]
+    primary_key = model.__mapper__.primary_key[0]
+    if not any(column.compare(primary_key) for column, _ in keys):
+        descending = keys[-1][1] if keys else False
+        keys.append((primary_key, descending))
+    return keys
+
+
+def _encode(values):
+    def default(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    raw = json.dumps(values, default=default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor, keys):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [_parse(value, column) for value, (column, _) in zip(values, keys)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse(value, column):
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _bind(value, dialect):
+    # SQLite stores CURRENT_TIMESTAMP server defaults without a fractional part,
+    # so whole-second datetimes must be compared in that same text form.
+    if dialect == "sqlite" and isinstance(value, datetime) and not value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _seek(keys, values, dialect):
+    """WHERE clause selecting rows strictly after the given sort key values"""
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        value = _bind(values[position], dialect)
+        after = column < value if descending else column > value
+        equal = [
+            previous == _bind(values[index], dialect)
+            for index, (previous, _) in enumerate(keys[:position])
+        ]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def _exact_count(query):
+    return query.order_by(None).count()
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, with its parameters bound by the driver in use"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _estimated_count(query):
+    """Row estimate from the query planner, without executing the query"""
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return _exact_count(query)
+
+    plan = query.session.execute(_Explain(query.order_by(None).statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class Pagination:
+    """Dependency carrying the paging parameters of a list request"""
+
+    def __init__(
+        self,
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+        count: Optional[str] = Query(None, pattern="^(exact|estimated)$"),
+    ):
+        self.response = response
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.count = count
+
+    def paginate(self, query, *order_by):
+        """Apply ordering and paging to the query and return the page rows"""
+        if self.count:
+            total = _estimated_count(query) if self.count == "estimated" else _exact_count(query)
+            self.response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+        if self.cursor is None:
+            return query.order_by(*order_by).offset(self.skip).limit(self.limit).all()
+
+        keys = _sort_keys(query, order_by)
+        # The next cursor is read off the last row, so its sort columns must be
+        # loaded even when the query selects only some columns (``fields=``)
+        model = query.column_descriptions[0]["entity"]
+        query = query.options(*[
+            undefer(getattr(model, column.key)) for column, _ in keys if column.key in model.__mapper__.column_attrs
+        ])
+        if self.cursor:
+            dialect = query.session.get_bind().dialect.name
+            query = query.filter(_seek(keys, _decode(self.cursor, keys), dialect))
+
+        ordering = [column.desc() if descending else column.asc() for column, descending in keys]
+        rows = query.order_by(None).order_by(*ordering).limit(self.limit + 1).all()
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            self.response.headers[NEXT_CURSOR_HEADER] = _encode(
+                [getattr(last, column.key) for column, _ in keys]
+            )
+        return rows
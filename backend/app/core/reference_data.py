@@ -0,0 +1,153 @@
+"""Cached reference data for dropdowns.
+
+Dropdown endpoints (vehicle types, branches, document categories, ...) return
+the distinct values of one column. A ``ReferenceData`` declares one such list.
+``values(db)`` serves it from memory, and only queries the database when the
+entry is missing or older than ``REFERENCE_CACHE_TTL_SECONDS``.
+
+Writes invalidate entries as they happen. A session listener notes every
+flush that inserts or deletes rows of a declared model, or changes one of the
+columns a list reads. The affected entries are dropped once the transaction
+commits, whichever handler made the change. Bulk ``query.update()`` and
+``query.delete()`` calls drop every list of their model.
+
+With several API processes, set ``CACHE_INVALIDATION_URL`` to a Redis URL.
+Each invalidation is then published through ``app.core.channels``, and every
+process drops the entry when the message arrives. Without it, other
+processes pick up a change once their entry's TTL runs out. Lists are loaded
+through a primary session, so a lagging replica cannot refill an entry with
+the values from before a write.
+"""
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+from typing import Callable, Iterable
+from uuid import uuid4
+
+from sqlalchemy import Column, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+
+from app.core.channels import ALL, invalidation_channel
+from app.core.config import settings
+
+# Session.info key of the lists a transaction has changed
+_PENDING = "reference_data_pending"
+
+
+class ReferenceCache:
+    """Named values kept in memory for ``ttl`` seconds or until invalidated"""
+
+    def __init__(self, ttl: float, channel=None):
+        self.ttl = ttl
+        self.channel = channel
+        self.entries = {}
+        # Bumped by every invalidation, so a load that raced with one is not kept
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.origin = uuid4().hex
+        if channel is not None:
+            channel.subscribe(self._received)
+
+    def get(self, name: str, load: Callable[[], list]) -> list:
+        if self.ttl <= 0:
+            return load()
+        now = time.monotonic()
+        entry = self.entries.get(name)
+        if entry is not None and entry[0] > now:
+            return list(entry[1])
+        generation = self.generation
+        value = load()
+        with self.lock:
+            if generation == self.generation:
+                self.entries[name] = (now + self.ttl, value)
+        return list(value)
+
+    def drop(self, names: Iterable[str]):
+        with self.lock:
+            self.generation += 1
+            if ALL in names:
+                self.entries.clear()
+            for name in names:
+                self.entries.pop(name, None)
+
+    def invalidate(self, *names: str):
+        """Drop the entries here and in every process listening on the channel"""
+        self.drop(names)
+        if self.channel is not None:
+            self.channel.publish(f"{self.origin} {','.join(names)}")
+
+    def _received(self, message: str):
+        origin, _, names = message.partition(" ")
+        if origin != self.origin:
+            self.drop(names.split(","))
+
+
+reference_cache = ReferenceCache(settings.REFERENCE_CACHE_TTL_SECONDS, channel=invalidation_channel("reference-data"))
+
+# model -> lists read from its table
+_registry = defaultdict(list)
+
+
+class ReferenceData:
+    """Distinct non-empty values of a column over the rows matching all conditions"""
+
+    def __init__(self, name: str, column, *conditions):
+        self.name = name
+        self.column = column
+        self.conditions = conditions
+        # Attributes whose changes can alter the list
+        self.watched = {column.key} | {
+            element.key
+            for condition in conditions
+            for element in visitors.iterate(condition)
+            if isinstance(element, Column)
+        }
+        _registry[column.class_].append(self)
+
+    def load(self, db: Session) -> list:
+        rows = db.query(self.column).distinct().filter(self.column.isnot(None), *self.conditions).all()
+        return [row[0] for row in rows if row[0]]
+
+    def values(self, db: Session) -> list:
+        return reference_cache.get(self.name, partial(self.load, db))
+
+
+def _pending(session) -> set:
+    return session.info.setdefault(_PENDING, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    for target in session.new | session.deleted:
+        _pending(session).update(data.name for data in _registry.get(type(target), ()))
+    for target in session.dirty:
+        lists = _registry.get(type(target))
+        if not lists:
+            continue
+        attrs = inspect(target).attrs
+        _pending(session).update(
+            data.name for data in lists
+            if any(attrs[key].history.has_changes() for key in data.watched)
+        )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in _registry:
+            _pending(orm_execute_state.session).update(data.name for data in _registry[mapper.class_])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate(session):
+    names = session.info.pop(_PENDING, None)
+    if names:
+        reference_cache.invalidate(*sorted(names))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING, None)
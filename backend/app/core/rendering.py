@@ -0,0 +1,270 @@
+"""Fast rendering of large list responses.
+
+With ``response_model=List[...]`` FastAPI validates every returned ORM row
+through the Pydantic schema before writing it out. At a few thousand rows
+that dominates the request. ``Renderer`` is a dependency for list endpoints
+whose rows come straight from the database. It reads the schema's fields off
+each row without validating them, and encodes the result with orjson. With
+``Accept: application/msgpack`` the result is sent as msgpack instead.
+
+Values are coerced to the schema's ``float``, ``int`` and ``Decimal`` types
+the way Pydantic would, so the JSON is the same as before. A schema with
+nested models, validators or custom serializers is rejected when its encoder
+is built. Endpoints keep their ``response_model`` for the OpenAPI docs.
+
+orjson and msgpack are optional (``pip install orjson msgpack``). Without
+orjson, JSON is encoded by pydantic-core; without msgpack, every response is
+JSON. ``python -m app.core.rendering benchmark [rows]`` compares the two paths
+on the largest lists.
+"""
+import sys
+import time as timer
+import types
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {MSGPACK, "application/x-msgpack"}
+
+# Types Pydantic coerces on output; anything else is passed through as read
+_COERCE = {float: float, int: int, Decimal: str}
+_CONTAINERS = {list, tuple, set, frozenset, dict}
+_UNIONS = {Union, getattr(types, "UnionType", Union)}
+_MISSING = object()
+
+
+def _converter(schema: Type[BaseModel], name: str, annotation) -> Callable:
+    if get_origin(annotation) in _UNIONS:
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        annotation = members[0] if len(members) == 1 else object
+    if (get_origin(annotation) in _CONTAINERS or annotation in _CONTAINERS
+            or isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+        raise TypeError(f"{schema.__name__}.{name} is not a scalar field")
+    return _COERCE.get(annotation)
+
+
+def _encoder(schema: Type[BaseModel], names: Optional[Tuple[str, ...]]) -> Callable[[Any], Dict[str, Any]]:
+    decorators = schema.__pydantic_decorators__
+    if (decorators.validators or decorators.field_validators or decorators.model_validators
+            or decorators.field_serializers or decorators.model_serializers or decorators.computed_fields):
+        raise TypeError(f"{schema.__name__} has validators or serializers; render it through response_model")
+
+    fields = []
+    for name, field in schema.model_fields.items():
+        if names is not None and name not in names:
+            continue
+        default = None if field.default is PydanticUndefined else field.default
+        key = field.serialization_alias or field.alias or name
+        fields.append((key, name, default, _converter(schema, name, field.annotation)))
+
+    def encode(row) -> Dict[str, Any]:
+        # Loaded columns sit in the instance dict; reading them there skips
+        # the ORM's attribute descriptors. Properties and unloaded columns
+        # still go through getattr.
+        loaded = getattr(row, "__dict__", {})
+        item = {}
+        for key, name, default, convert in fields:
+            value = loaded.get(name, _MISSING)
+            if value is _MISSING:
+                value = getattr(row, name, default)
+            item[key] = convert(value) if convert is not None and value is not None else value
+        return item
+
+    return encode
+
+
+_encoders = {}
+
+
+def row_encoder(schema: Type[BaseModel], names: Optional[Tuple[str, ...]] = None) -> Callable[[Any], Dict[str, Any]]:
+    """Function turning a trusted ORM row into the dict ``schema`` would serialize.
+
+    With ``names``, only those fields are read and written.
+    """
+    encoder = _encoders.get((schema, names))
+    if encoder is None:
+        encoder = _encoders[schema, names] = _encoder(schema, names)
+    return encoder
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset().total_seconds() == 0:
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(data) -> bytes:
+    """JSON bytes of plain data, formatted as Pydantic would"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z)
+    return to_json(data)
+
+
+def packb(data) -> bytes:
+    return msgpack.packb(data, default=_default)
+
+
+def _accepts_msgpack(accept: str) -> bool:
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        if media_type.strip() not in MSGPACK_TYPES:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class Renderer:
+    """Dependency rendering a list endpoint's rows on the fast path"""
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def rows(self, rows: Iterable, schema: Type[BaseModel], names: Optional[Tuple[str, ...]] = None) -> Response:
+        """Response with ORM rows as ``schema`` would serialize them, without validating them.
+
+        ``names`` limits the response to those fields, as picked by a ``Fieldset``.
+        """
+        encode = row_encoder(schema, names)
+        return self.data([encode(row) for row in rows])
+
+    def data(self, data) -> Response:
+        """Response with plain data, in the format the client accepts"""
+        if msgpack is not None and _accepts_msgpack(self.request.headers.get("accept", "")):
+            content, media_type = packb(data), MSGPACK
+        else:
+            content, media_type = dumps(data), JSON
+        response = Response(content, status_code=self.response.status_code or 200, media_type=media_type)
+        # Keep the headers other dependencies set, such as paging and validators
+        response.raw_headers.extend(self.response.raw_headers)
+        response.headers["Vary"] = "Accept"
+        return response
+
+
+def _sample_value(column, number: int):
+    python_type = column.type.python_type
+    if python_type is str:
+        value = "someone@example.com" if "email" in column.key else f"{column.key} {number}"
+        length = getattr(column.type, "length", None)
+        return value[:length] if length else value
+    if python_type is bool:
+        return number % 2 == 0
+    if python_type is int:
+        return number
+    if python_type is float:
+        return number * 1.5
+    if python_type is Decimal:
+        return Decimal(number) / 4
+    if python_type is datetime:
+        return datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+    if python_type is date:
+        return date(2026, 1, 1)
+    if python_type is time:
+        return time(12, 30)
+    return None
+
+
+def _sample_rows(model, count: int) -> list:
+    columns = [column for column in model.__table__.columns if column.key in model.__mapper__.attrs]
+    rows = []
+    for number in range(1, count + 1):
+        values = {}
+        for column in columns:
+            try:
+                values[column.key] = _sample_value(column, number)
+            except NotImplementedError:
+                pass
+        rows.append(model(**values))
+    return rows
+
+
+def _best_of(repeats: int, fn: Callable) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = timer.perf_counter()
+        fn()
+        best = min(best, timer.perf_counter() - started)
+    return best
+
+
+def benchmark(count: int = 5000, repeats: int = 5) -> List[tuple]:
+    """Seconds taken to render ``count`` rows of the largest lists, per path"""
+    from pydantic import TypeAdapter
+
+    from app.core.schema import load_models
+    from app.models.case import Case
+    from app.models.document import Document
+    from app.models.invoice import Invoice
+    from app.models.task import Task
+    from app.schemas.case import CaseResponse
+    from app.schemas.document import DocumentResponse
+    from app.schemas.invoice import InvoiceResponse
+    from app.schemas.task import TaskResponse
+
+    load_models()
+    results = []
+    for model, schema in ((Case, CaseResponse), (Document, DocumentResponse),
+                          (Invoice, InvoiceResponse), (Task, TaskResponse)):
+        rows = _sample_rows(model, count)
+        adapter = TypeAdapter(List[schema])
+        encode = row_encoder(schema)
+
+        # What FastAPI does for response_model=List[schema]
+        def current():
+            return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+        def fast():
+            return dumps([encode(row) for row in rows])
+
+        if orjson is not None and orjson.loads(current()) != orjson.loads(fast()):
+            raise AssertionError(f"{schema.__name__} renders differently on the fast path")
+        timings = [_best_of(repeats, current), _best_of(repeats, fast)]
+        if msgpack is not None:
+            timings.append(_best_of(repeats, lambda: packb([encode(row) for row in rows])))
+        results.append((model.__tablename__, count, *timings))
+    return results
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["benchmark"] or len(sys.argv) > 3 or not all(arg.isdigit() for arg in sys.argv[2:]):
+        print("usage: python -m app.core.rendering benchmark [rows]")
+        sys.exit(2)
+    print(f"JSON encoder: {'orjson' if orjson else 'pydantic-core'}; msgpack: {'yes' if msgpack else 'not installed'}")
+    for table_name, count, current, fast, *packed in benchmark(*map(int, sys.argv[2:3])):
+        line = (f"{table_name:<10} {count:>6} rows  response_model {current * 1000:8.1f} ms"
+                f"  fast {fast * 1000:8.1f} ms ({current / fast:4.1f}x)")
+        if packed:
+            line += f"  msgpack {packed[0] * 1000:8.1f} ms"
+        print(line)
@@ -0,0 +1,106 @@
+"""Resumable uploads, modelled on the tus protocol (https://tus.io).
+
+A client creates an upload session that declares the file size, then sends
+the bytes in one or more ``PATCH`` requests, each carrying the
+``Upload-Offset`` it starts at. When a connection drops, the bytes that
+arrived are kept. ``HEAD`` reports the offset to resume from, so a retry only
+resends what is missing. The partial file lives in ``INCOMING_DIR`` as
+``<token>.upload`` until the last byte arrives.
+
+Each PATCH writes through its own file handle at explicit positions and only
+advances the stored offset if it is still the one the PATCH started from.
+A duplicated retry therefore rewrites the same bytes and then loses the race
+with 409, instead of corrupting the file.
+
+Sessions idle for longer than ``SESSION_TTL`` are removed by
+``python -m app.core.blobs gc``.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+
+from app.core.storage import INCOMING_DIR
+from app.core.uploads import CHUNK_SIZE
+from app.models.upload_session import UploadSession
+
+UPLOAD_OFFSET = "Upload-Offset"
+UPLOAD_LENGTH = "Upload-Length"
+PATCH_CONTENT_TYPE = "application/offset+octet-stream"
+SESSION_TTL = timedelta(hours=24)
+
+
+def session_path(token: str) -> Path:
+    return INCOMING_DIR / f"{token}.upload"
+
+
+def _open_at(path: Path, offset: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file = open(path, "r+b" if path.exists() else "w+b")
+    file.seek(offset)
+    return file
+
+
+def _close(file):
+    # The stored offset promises these bytes exist, so make them durable first
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+
+
+async def append(request: Request, token: str, offset: int, length: int) -> int:
+    """Write the request body into the partial file at ``offset``; returns the offset reached.
+
+    Bytes received before a client disconnect are kept and counted.
+    """
+    if request.headers.get("content-type") != PATCH_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"PATCH bodies must be {PATCH_CONTENT_TYPE}")
+
+    file = await run_in_threadpool(_open_at, session_path(token), offset)
+    pending = []
+    pending_size = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                if offset + pending_size + len(chunk) > length:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds its {UPLOAD_LENGTH} of {length} bytes")
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= CHUNK_SIZE:
+                    await run_in_threadpool(file.write, b"".join(pending))
+                    offset += pending_size
+                    pending = []
+                    pending_size = 0
+        except ClientDisconnect:
+            pass
+        if pending:
+            await run_in_threadpool(file.write, b"".join(pending))
+            offset += pending_size
+    finally:
+        await run_in_threadpool(_close, file)
+    return offset
+
+
+def advance(db: Session, token: str, start: int, end: int) -> bool:
+    """Record that the bytes up to ``end`` arrived, unless another PATCH moved the offset first"""
+    updated = db.query(UploadSession).filter(
+        UploadSession.token == token,
+        UploadSession.upload_offset == start
+    ).update({"upload_offset": end}, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def expire_sessions(db: Session) -> int:
+    """Delete sessions idle for longer than SESSION_TTL with their partial files; returns sessions removed"""
+    cutoff = datetime.now(timezone.utc) - SESSION_TTL
+    sessions = db.query(UploadSession).filter(UploadSession.updated_at < cutoff).all()
+    for session in sessions:
+        session_path(session.token).unlink(missing_ok=True)
+        db.delete(session)
+    db.commit()
+    return len(sessions)
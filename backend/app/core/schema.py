@@ -0,0 +1,66 @@
+"""Bring an existing database up to the schema declared on the models.
+
+``Base.metadata.create_all`` only creates whole tables (with their indexes),
+so databases created before a table, column or index was declared need
+``python -m app.core.schema`` once after upgrading. It creates missing tables,
+adds missing columns (new columns are declared nullable or with a server
+default for this reason) and creates missing indexes. Everything that
+already exists is left untouched, which makes the command safe to re-run.
+"""
+import importlib
+import pkgutil
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+import app.models
+from app.core.database import Base, engine
+
+
+# Modules that attach index DDL (FTS tables, triggers) to model tables
+INDEX_MODULES = ("app.core.search", "app.core.fulltext")
+
+
+def load_models():
+    """Import every model module so relationships between them resolve"""
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+def upgrade(bind) -> list:
+    """Create missing tables, columns and indexes; returns a description of each change"""
+    load_models()
+    for module in INDEX_MODULES:
+        importlib.import_module(module)
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    changes = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            table.create(bind=bind)
+            changes.append(f"table {table.name}")
+            continue
+
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                definition = CreateColumn(column).compile(dialect=bind.dialect)
+                bind.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {definition}")
+                changes.append(f"column {table.name}.{column.name}")
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing_indexes:
+                index.create(bind=bind)
+                changes.append(f"index {index.name}")
+
+    return changes
+
+
+if __name__ == "__main__":
+    with engine.begin() as connection:
+        changes = upgrade(connection)
+    for change in changes:
+        print(f"Created {change}")
+    print(f"{len(changes)} change(s) applied")
@@ -0,0 +1,163 @@
+"""Indexed substring search for the ``search=`` parameter of list endpoints.
+
+A search matches rows where any of the model's searchable columns contains
+the term (case-insensitive), which is what the old ``ilike('%term%')``
+filters did, but backed by an index on each database:
+
+* PostgreSQL: ``pg_trgm`` GIN indexes on every searchable column, so
+  ``ILIKE '%term%'`` becomes a bitmap index scan. Rows are ranked by the best
+  ``word_similarity`` of the term against any column.
+* SQLite: an FTS5 table per model using the trigram tokenizer, kept in sync
+  by triggers on the source table and ranked by bm25. Terms shorter than a
+  trigram fall back to a LIKE scan.
+
+Offset pages of a search are ordered by rank first; keyset pages keep the
+endpoint's own order.
+
+Run ``python -m app.core.search setup`` once on an existing database to
+create the extension, indexes, FTS tables and triggers and fill the FTS
+tables. New databases get all of it from ``create_all``.
+"""
+import sys
+
+from sqlalchemy import DDL, Index, event, literal, or_, select, table, column, text
+from sqlalchemy.sql import func
+
+from app.core.database import Base, engine
+from app.models.case import Case
+from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.document import Document
+from app.models.vehicle import Vehicle
+from app.models.venue_booking import VenueBooking
+
+TRIGRAM = 3
+
+# model -> searchable columns
+SEARCH_COLUMNS = {
+    Case: (Case.case_number, Case.first_name, Case.last_name),
+    Invoice: (Invoice.invoice_number, Invoice.client_name),
+    Payment: (Payment.payment_number, Payment.payer_name, Payment.invoice_number),
+    Document: (Document.title, Document.description, Document.tags, Document.client_name),
+    Vehicle: (Vehicle.make, Vehicle.model, Vehicle.vin, Vehicle.license_plate),
+    VenueBooking: (VenueBooking.contact_person,),
+}
+
+# model -> (foreign key, related model) whose matches also match the row
+RELATED = {
+    VenueBooking: (VenueBooking.case_id, Case),
+}
+
+
+def _fts_name(model) -> str:
+    return f"{model.__tablename__}_search"
+
+
+def _fts_table(model):
+    names = [c.key for c in SEARCH_COLUMNS[model]]
+    return table(_fts_name(model), column("rowid"), column("rank"), *[column(name) for name in names])
+
+
+def _fts_ddl(model) -> list:
+    """Statements creating the FTS5 table and the triggers that keep it in sync"""
+    source = model.__tablename__
+    fts = _fts_name(model)
+    names = [c.key for c in SEARCH_COLUMNS[model]]
+    columns = ", ".join(names)
+    new_values = ", ".join(f"new.{name}" for name in names)
+    old_values = ", ".join(f"old.{name}" for name in names)
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+for _model, _columns in SEARCH_COLUMNS.items():
+    for _column in _columns:
+        Index(
+            f"ix_{_model.__tablename__}_{_column.key}_trgm",
+            _column,
+            postgresql_using="gin",
+            postgresql_ops={_column.key: "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql")
+    for _statement in _fts_ddl(_model):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def _like_matches(model, term):
+    pattern = f"%{term}%"
+    columns = SEARCH_COLUMNS[model]
+    return select(model.id.label("id"), literal(0.0).label("score")).where(
+        or_(*[c.ilike(pattern) for c in columns])
+    )
+
+
+def _matches(model, term, dialect):
+    """SELECT of (id, score) for the rows matching the term; higher scores rank first"""
+    columns = SEARCH_COLUMNS[model]
+    if dialect == "postgresql":
+        score = func.greatest(*[func.word_similarity(term, func.coalesce(c, "")) for c in columns])
+        return select(model.id.label("id"), score.label("score")).where(
+            or_(*[c.ilike(f"%{term}%") for c in columns])
+        )
+    if dialect == "sqlite" and len(term) >= TRIGRAM:
+        fts = _fts_table(model)
+        phrase = '"' + term.replace('"', '""') + '"'
+        return select(fts.c.rowid.label("id"), (-fts.c.rank).label("score")).where(
+            text(f"{_fts_name(model)} MATCH :phrase").bindparams(phrase=phrase)
+        )
+    return _like_matches(model, term)
+
+
+def apply_search(query, model, term: str):
+    """Restrict the query to rows matching ``term``, best matches first"""
+    dialect = query.session.get_bind().dialect.name
+    matches = _matches(model, term, dialect).subquery()
+
+    if model not in RELATED:
+        query = query.join(matches, matches.c.id == model.id)
+    else:
+        foreign_key, related = RELATED[model]
+        related_ids = select(_matches(related, term, dialect).subquery().c.id)
+        query = query.outerjoin(matches, matches.c.id == model.id).filter(
+            or_(matches.c.id.isnot(None), foreign_key.in_(related_ids))
+        )
+    return query.order_by(func.coalesce(matches.c.score, 0.0).desc())
+
+
+def setup(connection):
+    """Create the search indexes and FTS tables on an existing database and fill them"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for model in SEARCH_COLUMNS:
+            for index in model.__table__.indexes:
+                if index.name.endswith("_trgm"):
+                    index.create(bind=connection, checkfirst=True)
+    elif dialect == "sqlite":
+        for model in SEARCH_COLUMNS:
+            for statement in _fts_ddl(model):
+                connection.execute(text(statement))
+            fts = _fts_name(model)
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["setup"]:
+        print("usage: python -m app.core.search setup")
+        sys.exit(2)
+
+    with engine.begin() as connection:
+        setup(connection)
+    print("Search indexes ready")
@@ -0,0 +1,107 @@
+"""Sequential business numbers (PAY-001, PO-2025-0001, ...).
+
+Each sequence keeps its last issued value in one ``sequences`` row per
+period. Numbers are taken with a single ``UPDATE ... SET last_value =
+last_value + n``, which locks that row until the caller's transaction ends,
+so concurrent requests never receive the same number and issuing one costs
+an indexed update instead of a count over the table. If the transaction
+rolls back, the reservation rolls back with it.
+
+The first time a sequence (or a new year of a yearly sequence) is used, its
+row is seeded from the highest number already stored in the target column,
+so existing data keeps its numbers.
+"""
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.sequence import Sequence
+from app.models.case import Case
+from app.models.payment import Payment
+from app.models.transaction import Transaction
+from app.models.family import Family
+from app.models.expense import Expense
+from app.models.stock_movement import StockMovement
+from app.models.purchase_order import PurchaseOrder
+
+# name -> (numbered column, format, restarts every year)
+SEQUENCES = {
+    "cases": (Case.case_number, "FD-{year}-{number:04d}", True),
+    "payments": (Payment.payment_number, "PAY-{number:03d}", False),
+    "transactions": (Transaction.transaction_id, "TXN-{number:03d}", False),
+    "families": (Family.family_id, "FAM-{number:03d}", False),
+    "expenses": (Expense.expense_number, "EXP-{number:03d}", False),
+    "stock_movements": (StockMovement.movement_id, "MOV-{year}-{number:04d}", True),
+    "purchase_orders": (PurchaseOrder.po_number, "PO-{year}-{number:04d}", True),
+}
+
+
+def _existing_max(db: Session, column, prefix: str) -> int:
+    """Highest number already issued under the prefix"""
+    highest = 0
+    for (value,) in db.query(column).filter(column.like(f"{prefix}%")).yield_per(1000):
+        suffix = value[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+def _create(db: Session, name: str, period: str, start: int):
+    table = Sequence.__table__
+    values = {"name": name, "period": period, "last_value": start}
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.execute(insert(table).values(**values).on_conflict_do_nothing(index_elements=["name", "period"]))
+        return
+
+    exists = db.execute(
+        select(table.c.id).where(table.c.name == name, table.c.period == period)
+    ).first()
+    if exists is None:
+        db.execute(table.insert().values(**values))
+
+
+def _increment(db: Session, name: str, period: str, count: int):
+    """Advance the sequence row by ``count``; returns the new last value, or None if the row is missing"""
+    table = Sequence.__table__
+    stmt = (
+        update(table)
+        .where(table.c.name == name, table.c.period == period)
+        .values(last_value=table.c.last_value + count)
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(table.c.last_value)).scalar()
+
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return db.execute(
+        select(table.c.last_value).where(table.c.name == name, table.c.period == period)
+    ).scalar()
+
+
+def reserve_numbers(db: Session, name: str, count: int) -> List[str]:
+    """Reserve ``count`` consecutive numbers of a sequence in one round trip"""
+    if count < 1:
+        return []
+
+    column, template, yearly = SEQUENCES[name]
+    year = datetime.now().year
+    period = str(year) if yearly else ""
+
+    last = _increment(db, name, period, count)
+    if last is None:
+        prefix = template.split("{number")[0].format(year=year)
+        _create(db, name, period, _existing_max(db, column, prefix))
+        last = _increment(db, name, period, count)
+
+    return [template.format(year=year, number=number) for number in range(last - count + 1, last + 1)]
+
+
+def next_number(db: Session, name: str) -> str:
+    """Next number of a sequence, e.g. ``next_number(db, "payments") == "PAY-042"``"""
+    return reserve_numbers(db, name, 1)[0]
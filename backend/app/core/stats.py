@@ -0,0 +1,98 @@
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+
+class Count:
+    """Number of rows, optionally restricted to rows matching all conditions"""
+
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def expression(self):
+        if not self.conditions:
+            return func.count()
+        return func.sum(case((and_(*self.conditions), 1), else_=0))
+
+    def convert(self, value):
+        return int(value or 0)
+
+
+class Sum:
+    """Sum of a column over the rows matching all conditions"""
+
+    function = func.sum
+
+    def __init__(self, column, *conditions, ndigits=None, scale=None, cast=float):
+        self.column = column
+        self.conditions = conditions
+        self.ndigits = ndigits
+        self.scale = scale
+        self.cast = cast
+
+    def expression(self):
+        column = self.column
+        if self.conditions:
+            column = case((and_(*self.conditions), column))
+        return self.function(column)
+
+    def convert(self, value):
+        value = self.cast(value or 0)
+        if self.scale is not None:
+            value *= self.scale
+        if self.ndigits is not None:
+            value = round(value, self.ndigits)
+        return value
+
+
+class Avg(Sum):
+    """Average of a column over the rows matching all conditions"""
+
+    function = func.avg
+
+
+class CountDistinct:
+    """Number of distinct non-null values in a column"""
+
+    def __init__(self, column):
+        self.column = column
+
+    def expression(self):
+        return func.count(func.distinct(self.column))
+
+    def convert(self, value):
+        return int(value or 0)
+
+
+class StatsSpec:
+    """Declarative set of counters for a model, computed in a single query.
+
+    Every counter becomes one column of a conditional-aggregation SELECT
+    (``SUM(CASE WHEN ... THEN 1 ELSE 0 END)`` and friends), so a ``/stats``
+    route costs one round trip however many counters it reports.
+    """
+
+    def __init__(self, model, *filters, **fields):
+        self.model = model
+        self.filters = filters
+        self.fields = fields
+
+    def statement(self):
+        columns = [
+            aggregate.expression().label(name)
+            for name, aggregate in self.fields.items()
+        ]
+        stmt = select(*columns).select_from(self.model)
+        if self.filters:
+            stmt = stmt.where(*self.filters)
+        return stmt
+
+    def convert(self, row):
+        mapping = row._mapping if row is not None else {}
+        return {
+            name: aggregate.convert(mapping.get(name))
+            for name, aggregate in self.fields.items()
+        }
+
+    def compute(self, db: Session) -> dict:
+        row = db.execute(self.statement()).first()
+        return self.convert(row)
@@ -0,0 +1,270 @@
+"""Pluggable storage for uploaded files.
+
+Files are addressed by a key such as ``blobs/ab/cd/<sha256>``. The backend
+chosen by ``STORAGE_BACKEND`` decides where the bytes live:
+
+* ``local``: under ``LOCAL_STORAGE_DIR`` on the API node's disk, served by
+  the API with Range and conditional request support.
+* ``s3``: in an S3-compatible bucket (AWS, MinIO, ...). Large files are
+  uploaded in parts, and downloads are redirected to a short-lived presigned
+  URL, so the bytes never pass through the API process and any number of
+  API nodes can share the files.
+
+Uploads are always received into a local temporary file first and then
+handed to ``put_file``.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+
+from app.core.config import settings
+
+MB = 1024 * 1024
+
+# Uploads are received here before they are handed to the storage backend
+INCOMING_DIR = Path(settings.LOCAL_STORAGE_DIR) / "incoming"
+
+
+def content_disposition(filename: str, inline: bool = False) -> str:
+    disposition = "inline" if inline else "attachment"
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+class LocalStorage:
+    """Files in a directory on this node"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        path = self.root / key
+        # Keys are relative; one climbing out of the root names no stored file
+        if not path.resolve().is_relative_to(self.root.resolve()):
+            raise FileNotFoundError(key)
+        return path
+
+    def exists(self, key: str) -> bool:
+        try:
+            return self.path(key).is_file()
+        except FileNotFoundError:
+            return False
+
+    def put_file(self, key: str, source: Path):
+        """Move a local file to ``key``"""
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def size(self, key: str) -> int:
+        return self.path(key).stat().st_size
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[Path]:
+        """A path on this node holding the file, for parsers that read it in place"""
+        yield self.path(key)
+
+    def delete(self, key: str):
+        try:
+            self.path(key).unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        """(key, modified timestamp) of every file under ``prefix``"""
+        for path in self.path(prefix).rglob("*"):
+            if path.is_file():
+                yield path.relative_to(self.root).as_posix(), path.stat().st_mtime
+
+    def url(self, key: str, filename: str, media_type: Optional[str], inline: bool = False) -> Optional[str]:
+        """Direct download URL; local files have none and are served by the API"""
+        return None
+
+
+class S3Storage:
+    """Objects in an S3-compatible bucket"""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, access_key_id: Optional[str] = None,
+                 secret_access_key: Optional[str] = None):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.transfer = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * MB,
+        )
+        self.client_error = ClientError
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client_error as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put_file(self, key: str, source: Path):
+        """Upload a local file to ``key`` (in parts when large) and remove the local copy"""
+        self.client.upload_file(str(source), self.bucket, self._key(key), Config=self.transfer)
+        source.unlink(missing_ok=True)
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[Path]:
+        """Download the object to a temporary file, removed on exit"""
+        INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=INCOMING_DIR, suffix=".part", delete=False) as file:
+            path = Path(file.name)
+        try:
+            self.client.download_file(self.bucket, self._key(key), str(path), Config=self.transfer)
+            yield path
+        finally:
+            path.unlink(missing_ok=True)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):], item["LastModified"].timestamp()
+
+    def url(self, key: str, filename: str, media_type: Optional[str], inline: bool = False) -> Optional[str]:
+        params = {
+            "Bucket": self.bucket,
+            "Key": self._key(key),
+            "ResponseContentDisposition": content_disposition(filename, inline),
+        }
+        if media_type:
+            params["ResponseContentType"] = media_type
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=settings.S3_URL_EXPIRY_SECONDS
+        )
+
+
+class LegacyFiles(LocalStorage):
+    """Files recorded by their path before uploads went through get_storage().
+
+    Keys are the recorded paths, relative to the working directory. A path
+    that resolves outside ``directory`` is treated as missing, so a recorded
+    path can never reach other files on the node.
+    """
+
+    def __init__(self, directory):
+        super().__init__(Path.cwd())
+        self.directory = Path(directory).resolve()
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.directory):
+            raise FileNotFoundError(key)
+        return path
+
+
+# Where uploads were written before they went through get_storage()
+LEGACY_UPLOAD_DIR = "uploads"
+LEGACY_FILES = LegacyFiles(LEGACY_UPLOAD_DIR)
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    """The configured storage backend"""
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_DIR)
+    raise RuntimeError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def file_response(request: Request, key: str, filename: str, media_type: Optional[str] = None,
+                  etag: Optional[str] = None, inline: bool = False, storage=None) -> Response:
+    """Download response for a stored file.
+
+    Redirects to a presigned URL when the backend has one; otherwise serves
+    the local file with Range, If-Range and If-None-Match support. ``etag``
+    should identify the content exactly (a content hash); local files fall
+    back to Starlette's mtime/size tag.
+    """
+    storage = storage or get_storage()
+    headers = {"Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag and if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    url = storage.url(key, filename, media_type, inline)
+    if url:
+        return RedirectResponse(url, status_code=307, headers=headers)
+
+    try:
+        path = storage.path(key)
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    response = FileResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        content_disposition_type="inline" if inline else "attachment",
+    )
+    if if_none_match and etag_matches(if_none_match, response.headers["etag"]):
+        return Response(status_code=304, headers={
+            name: response.headers[name] for name in ("etag", "cache-control", "last-modified")
+        })
+    return response
@@ -0,0 +1,170 @@
+"""Background thumbnails for uploaded images and PDFs.
+
+Once an upload has committed, ``schedule`` hands the stored file to the
+background worker pool. The workers render JPEG variants of the image, or of the
+first page of a PDF, and store them beside the original as
+``<key>.<variant>.jpg``. When the variants are ready, the owning rows get
+``has_thumbnail = True``, and their API responses then include
+``thumbnail_url``. List pages fetch those few-kilobyte variants instead of
+the originals. Variants depend only on the file's content, so a duplicate
+upload reuses the existing ones.
+
+Rendering needs Pillow, plus pypdfium2 for PDFs. Without them files are left
+without thumbnails. Workers open the stored file in place instead of reading
+it into memory, and files over ``MAX_SOURCE_SIZE`` get no thumbnail.
+``python -m app.core.thumbnails backfill`` renders thumbnails for files
+stored before this existed.
+"""
+import logging
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from app.core import workers
+from app.core.database import SessionLocal
+from app.core.storage import INCOMING_DIR, get_storage
+
+logger = logging.getLogger(__name__)
+
+# variant -> longest side in pixels
+VARIANTS = {"thumb": 320, "preview": 1280}
+IMAGE_TYPES = {"JPG", "JPEG", "PNG", "GIF", "WEBP", "BMP", "TIF", "TIFF"}
+# Larger files are not rendered, so one huge scan cannot exhaust a worker's memory
+MAX_SOURCE_SIZE = 200 * 1024 * 1024
+
+
+def variant_key(key: str, variant: str = "thumb") -> str:
+    return f"{key}.{variant}.jpg"
+
+
+def kind_of(file_type: Optional[str]) -> Optional[str]:
+    """'image', 'pdf' or None for files that get no thumbnail"""
+    file_type = (file_type or "").upper()
+    if file_type in IMAGE_TYPES:
+        return "image"
+    if file_type == "PDF":
+        return "pdf"
+    return None
+
+
+def _first_page(path: Path):
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        page = pdf[0]
+        scale = max(VARIANTS.values()) / max(page.get_size())
+        return page.render(scale=scale).to_pil()
+    finally:
+        pdf.close()
+
+
+def _flatten(image):
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render(key: str, kind: str) -> bool:
+    """Render and store every variant of ``key``; runs in a worker process"""
+    storage = get_storage()
+    if all(storage.exists(variant_key(key, variant)) for variant in VARIANTS):
+        return True
+    try:
+        from PIL import Image
+        if storage.size(key) > MAX_SOURCE_SIZE:
+            logger.warning("Not rendering thumbnails for %s; the file is over %d bytes", key, MAX_SOURCE_SIZE)
+            return False
+        with storage.local_path(key) as path:
+            if kind == "pdf":
+                image = _flatten(_first_page(path))
+            else:
+                with Image.open(path) as source:
+                    image = _flatten(source)
+
+        INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size))
+            with tempfile.NamedTemporaryFile(dir=INCOMING_DIR, suffix=".part", delete=False) as file:
+                resized.save(file, "JPEG", quality=80, optimize=True)
+            storage.put_file(variant_key(key, variant), Path(file.name))
+    except ImportError:
+        logger.warning("Thumbnails need Pillow (and pypdfium2 for PDFs); skipping %s", key)
+        return False
+    except Exception:
+        logger.exception("Could not render thumbnails for %s", key)
+        return False
+    return True
+
+
+def _mark(model, condition, ready: Optional[bool]):
+    db = SessionLocal()
+    try:
+        db.query(model).filter(condition).update({"has_thumbnail": bool(ready)}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def schedule(key: str, file_type: Optional[str], model, condition):
+    """Render thumbnails of ``key`` in the background, then flag the ``model`` rows matching ``condition``"""
+    kind = kind_of(file_type)
+    if kind is not None:
+        try:
+            workers.submit(render, key, kind, callback=partial(_mark, model, condition))
+        except Exception:
+            # The upload is already committed; backfill renders what was missed
+            logger.exception("Could not schedule thumbnails for %s", key)
+
+
+def backfill() -> int:
+    """Render thumbnails for stored documents and case photos that have none yet; returns files rendered"""
+    from app.core.blobs import blob_key
+    from app.core.schema import load_models
+    from app.models.case import Case
+    from app.models.document import Document
+
+    load_models()
+    db = SessionLocal()
+    try:
+        documents = db.query(Document.content_hash, Document.file_type).filter(
+            Document.content_hash.isnot(None),
+            Document.has_thumbnail.is_(None),
+            Document.is_deleted == False
+        ).distinct().all()
+        jobs = [
+            (blob_key(content_hash), kind_of(file_type), Document, Document.content_hash == content_hash)
+            for content_hash, file_type in documents
+        ]
+        cases = db.query(Case.id, Case.photo_key).filter(
+            Case.photo_key.isnot(None),
+            Case.has_thumbnail.is_(None)
+        ).all()
+        jobs += [
+            (photo_key, kind_of(Path(photo_key).suffix.lstrip(".")), Case, Case.id == case_id)
+            for case_id, photo_key in cases
+        ]
+    finally:
+        db.close()
+
+    jobs = [job for job in jobs if job[1]]
+    results = workers.run_all(render, [key for key, *_ in jobs], [kind for _, kind, *_ in jobs])
+    for (key, kind, model, condition), ready in zip(jobs, results):
+        _mark(model, condition, ready)
+    return len(jobs)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python -m app.core.thumbnails backfill")
+        sys.exit(2)
+    print(f"Rendered thumbnails for {backfill()} file(s)")
@@ -0,0 +1,226 @@
+"""Streaming multipart uploads.
+
+``receive_file`` parses a ``multipart/form-data`` request body as it arrives
+instead of letting the framework spool the whole body first. The file part
+is hashed and written to a temporary file in batches on the threadpool, so
+the event loop only ever holds about ``CHUNK_SIZE`` bytes per upload and is
+never blocked by disk writes.
+
+Limits are enforced while the body arrives. A Content-Length that is already
+too large is refused before anything is read. The file part is counted as it
+streams, and ``check`` sees the part's filename as soon as its headers are
+parsed. Rejected uploads stop after the chunk that revealed the problem.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+CHUNK_SIZE = 1024 * 1024
+# Room for boundaries and part headers when comparing Content-Length to a file size limit
+MULTIPART_OVERHEAD = 16 * 1024
+
+# OpenAPI body for routes that call receive_file, which FastAPI cannot infer
+MULTIPART_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ReceivedFile:
+    """An uploaded file part that has been written to a temporary path"""
+
+    def __init__(self, filename: str, content_type: Optional[str], path: Path, size: int, sha256: str):
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def discard(self):
+        self.path.unlink(missing_ok=True)
+
+
+class _FileSink:
+    """Temporary file plus running size and digest, written from the threadpool"""
+
+    def __init__(self, directory: Path):
+        descriptor, name = tempfile.mkstemp(dir=directory, suffix=".part")
+        self.path = Path(name)
+        self.file = os.fdopen(descriptor, "wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.digest.update(data)
+        self.file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        self.file.close()
+
+    def abandon(self):
+        self.file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class _PartCollector:
+    """Parser callbacks that keep the bytes of one named file part"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.headers = {}
+        self.header_field = b""
+        self.header_value = b""
+        self.in_target = False
+        self.found = False
+        self.filename = None
+        self.content_type = None
+        self.pending = []
+        self.pending_size = 0
+        self.size = 0
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self.headers = {}
+
+    def on_header_field(self, data, start, end):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        self.in_target = name == self.field and b"filename" in options and not self.found
+        if self.in_target:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = self.headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data, start, end):
+        if self.in_target:
+            self.pending.append(data[start:end])
+            self.pending_size += end - start
+            self.size += end - start
+
+    def on_part_end(self):
+        self.in_target = False
+
+    def take(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending = []
+        self.pending_size = 0
+        return data
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File exceeds the {max_size / (1024 * 1024):g} MB limit")
+
+
+async def receive_file(
+    request: Request,
+    directory: Path,
+    field: str = "file",
+    max_size: Optional[int] = None,
+    check: Optional[Callable[[str, Optional[str]], None]] = None,
+) -> ReceivedFile:
+    """Stream the ``field`` file part of a multipart request into ``directory``.
+
+    Uploads larger than ``max_size`` bytes are refused with 413. ``check`` is
+    called with the filename and content type before any of the file is
+    written and rejects it by raising an HTTPException.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length", "")
+    if max_size is not None and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise _too_large(max_size)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    collector = _PartCollector(field)
+    parser = MultipartParser(boundary, collector.callbacks())
+    sink = await run_in_threadpool(_FileSink, directory)
+    checked = False
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if check and collector.found and not checked:
+                checked = True
+                check(Path(collector.filename).name, collector.content_type)
+            if max_size is not None and collector.size > max_size:
+                raise _too_large(max_size)
+            if collector.pending_size >= CHUNK_SIZE:
+                await run_in_threadpool(sink.write, collector.take())
+        parser.finalize()
+        if collector.pending:
+            await run_in_threadpool(sink.write, collector.take())
+        await run_in_threadpool(sink.close)
+    except FormParserError:
+        sink.abandon()
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+    except BaseException:
+        # Also reached when the client disconnects mid-upload
+        sink.abandon()
+        raise
+
+    if not collector.found:
+        sink.path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"No file uploaded in field '{field}'")
+
+    return ReceivedFile(
+        filename=Path(collector.filename).name,
+        content_type=collector.content_type,
+        path=sink.path,
+        size=sink.size,
+        sha256=sink.digest.hexdigest(),
+    )
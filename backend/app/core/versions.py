@@ -0,0 +1,214 @@
+"""Version history of documents.
+
+Every file uploaded for a document becomes a row in ``document_versions``.
+The ``Document`` row holds the number of its current version and repeats
+that version's file fields. Reading or downloading the latest version
+therefore never touches the history.
+
+Once a text-like version (TXT, CSV, HTML, ...) is superseded, the background
+workers rewrite it as a binary delta (``app.core.delta``) against the version
+that replaced it, and its whole file is released to the blob store's gc. The
+latest version is always whole. An older one is rebuilt by applying deltas
+backwards from the nearest whole version. Every ``KEYFRAME_INTERVAL``-th
+version stays whole, which bounds that chain.
+
+``python -m app.core.versions compact`` turns superseded versions into deltas
+when that was missed, for example while ``BACKGROUND_WORKERS`` was 0.
+"""
+import logging
+import sys
+import tempfile
+from contextlib import closing
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+
+from app.core import workers
+from app.core.blobs import blob_key
+from app.core.database import SessionLocal
+from app.core.delta import diff, patch
+from app.core.storage import (
+    INCOMING_DIR, LEGACY_FILES, content_disposition, etag_matches, file_response, get_storage
+)
+from app.models.document import Document
+from app.models.document_version import DocumentVersion
+
+logger = logging.getLogger(__name__)
+
+DELTA_TYPES = {"TXT", "CSV", "MD", "LOG", "HTML", "HTM", "XML", "JSON", "RTF", "SVG"}
+# Larger files are kept whole; deltas are built in memory
+DELTA_MAX_SIZE = 16 * 1024 * 1024
+# Deltas saving less than half of the file are not worth rebuilding on read
+DELTA_MAX_RATIO = 0.5
+KEYFRAME_INTERVAL = 10
+
+# (version id, key of the version's file, key of its successor's file, delta key)
+DeltaJob = Tuple[int, str, str, str]
+
+
+def delta_key(version: DocumentVersion) -> str:
+    return f"versions/{version.document_id}/{version.version_number}.delta"
+
+
+def first_version(document: Document) -> DocumentVersion:
+    """Version 1 of a document, describing the file it was created with"""
+    return DocumentVersion(
+        document_id=document.id,
+        version_number=1,
+        file_name=document.file_name,
+        file_path=document.file_path,
+        file_size=document.file_size,
+        file_type=document.file_type,
+        mime_type=document.mime_type,
+        content_hash=document.content_hash,
+        uploaded_by=document.uploaded_by,
+        created_at=document.created_at,
+    )
+
+
+def supersede(version: DocumentVersion):
+    version.superseded_at = datetime.now(timezone.utc)
+
+
+def version_file(version: DocumentVersion):
+    """(storage, key) holding the whole file of a version"""
+    if version.content_hash:
+        return get_storage(), blob_key(version.content_hash)
+    return LEGACY_FILES, version.file_path
+
+
+def delta_job(version: DocumentVersion, successor: DocumentVersion) -> Optional[DeltaJob]:
+    """The job storing ``version`` as a delta against ``successor``, if it qualifies"""
+    if version.version_number % KEYFRAME_INTERVAL == 0:
+        return None
+    for candidate in (version, successor):
+        if (not candidate.content_hash or candidate.delta_key
+                or (candidate.file_type or "").upper() not in DELTA_TYPES
+                or candidate.file_size > DELTA_MAX_SIZE):
+            return None
+    return version.id, blob_key(version.content_hash), blob_key(successor.content_hash), delta_key(version)
+
+
+def _read(storage, key: str) -> bytes:
+    with closing(storage.open(key)) as source:
+        return source.read()
+
+
+def make_delta(key: str, successor_key: str, target_key: str) -> bool:
+    """Store the file ``key`` as a delta against ``successor_key``; runs in a worker process"""
+    storage = get_storage()
+    try:
+        target = _read(storage, key)
+        base = _read(storage, successor_key)
+        delta = diff(base, target)
+        if len(delta) > len(target) * DELTA_MAX_RATIO:
+            return False
+        if patch(base, delta) != target:
+            logger.error("Delta of %s against %s does not round-trip", key, successor_key)
+            return False
+        INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=INCOMING_DIR, suffix=".part", delete=False) as file:
+            file.write(delta)
+        storage.put_file(target_key, Path(file.name))
+    except Exception:
+        logger.exception("Could not store %s as a delta", key)
+        return False
+    return True
+
+
+def _record(version_id: int, target_key: str, stored: Optional[bool]):
+    if not stored:
+        return
+    db = SessionLocal()
+    try:
+        version = db.get(DocumentVersion, version_id)
+        if version is not None and version.delta_key is None:
+            # Loaded and assigned, not bulk-updated, so the blob reference is released
+            version.delta_key = target_key
+            version.delta_base = version.version_number + 1
+            db.commit()
+    finally:
+        db.close()
+
+
+def schedule(job: Optional[DeltaJob]):
+    """Run a delta job in the background"""
+    if job is not None:
+        version_id, key, successor_key, target_key = job
+        try:
+            workers.submit(make_delta, key, successor_key, target_key, callback=partial(_record, version_id, target_key))
+        except Exception:
+            # The version is already committed and stays stored whole
+            logger.exception("Could not schedule a delta of %s", key)
+
+
+def content(db: Session, version: DocumentVersion) -> bytes:
+    """The bytes of a version, rebuilt from deltas if necessary"""
+    deltas = []
+    while version.delta_key:
+        deltas.append(version.delta_key)
+        version = db.query(DocumentVersion).filter(
+            DocumentVersion.document_id == version.document_id,
+            DocumentVersion.version_number == version.delta_base
+        ).one()
+    data = _read(*version_file(version))
+    storage = get_storage()
+    for key in reversed(deltas):
+        data = patch(data, _read(storage, key))
+    return data
+
+
+def version_response(request: Request, db: Session, version: DocumentVersion, inline: bool = False) -> Response:
+    """Download response for a version of a document"""
+    if version.delta_key is None:
+        storage, key = version_file(version)
+        return file_response(request, key, version.file_name, version.mime_type,
+                             etag=version.content_hash, inline=inline, storage=storage)
+
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "ETag": f'"{version.content_hash}"',
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = content_disposition(version.file_name, inline)
+    return Response(content(db, version), media_type=version.mime_type or "application/octet-stream",
+                    headers=headers)
+
+
+def compact() -> int:
+    """Store every qualifying superseded version as a delta; returns versions compacted"""
+    from app.core.schema import load_models
+
+    load_models()
+    successor = aliased(DocumentVersion)
+    db = SessionLocal()
+    try:
+        pairs = db.query(DocumentVersion, successor).join(successor, and_(
+            successor.document_id == DocumentVersion.document_id,
+            successor.version_number == DocumentVersion.version_number + 1
+        )).filter(
+            DocumentVersion.superseded_at.isnot(None),
+            DocumentVersion.delta_key.is_(None)
+        ).all()
+        jobs = [job for job in (delta_job(version, base) for version, base in pairs) if job]
+    finally:
+        db.close()
+
+    results = workers.run_all(make_delta, *[[job[n] for job in jobs] for n in (1, 2, 3)])
+    for (version_id, _, _, target_key), stored in zip(jobs, results):
+        _record(version_id, target_key, stored)
+    return sum(results)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["compact"]:
+        print("usage: python -m app.core.versions compact")
+        sys.exit(2)
+    print(f"Stored {compact()} version(s) as deltas")
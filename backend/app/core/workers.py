@@ -0,0 +1,73 @@
+"""Process pool for CPU-heavy work that follows an upload.
+
+Thumbnail rendering and text extraction run in ``BACKGROUND_WORKERS``
+spawned processes. They never hold the API process's GIL, and a crash in a
+parser cannot take a request down with it. Spawned workers build their own
+storage clients instead of inheriting the parent's sockets.
+
+A worker that dies (killed for memory while rendering a large scan, say)
+breaks the whole pool. The broken pool is then shut down and the next job
+starts a fresh one, so one bad file does not stop later uploads from being
+processed.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if _pool is None and settings.BACKGROUND_WORKERS > 0:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.BACKGROUND_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _discard(pool: ProcessPoolExecutor):
+    """Forget a broken pool, so the next job starts a new one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        logger.error("Background worker pool broke; starting a new one for the next job")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _done(pool, callback, future):
+    if future.exception() is not None:
+        logger.error("Background job failed", exc_info=future.exception())
+        if isinstance(future.exception(), BrokenProcessPool):
+            _discard(pool)
+        callback(None)
+    else:
+        callback(future.result())
+
+
+def submit(fn, *args, callback: Callable):
+    """Run ``fn(*args)`` in the pool, then ``callback(result)`` in this process (None if it raised)"""
+    pool = _get_pool()
+    if pool is None:
+        return
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard(pool)
+        pool = _get_pool()
+        future = pool.submit(fn, *args)
+    future.add_done_callback(partial(_done, pool, callback))
+
+
+def run_all(fn, *iterables) -> list:
+    """``fn`` over the iterables in a temporary pool, for command-line backfills"""
+    with ProcessPoolExecutor(max_workers=max(settings.BACKGROUND_WORKERS, 1)) as pool:
+        return list(pool.map(fn, *iterables))
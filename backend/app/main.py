@@ -2,6 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .core.database import engine, Base
+from .core.entity_cache import entity_cache
+from .core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .core.resumable import UPLOAD_LENGTH, UPLOAD_OFFSET
 from .api import contact, cases, schedules, arrangements, venue_bookings, service_addons, vehicles
 from .api import next_of_kin as next_of_kin_api
 from .api import case_notes as case_notes_api
@@ -53,6 +56,17 @@ from .models import family as family_model
 from .models import communication as communication_model
 from .models import followup as followup_model
 from .models import preneed as preneed_model
+from .models import dashboard_counter as dashboard_counter_model
+from .models import sequence as sequence_model
+from .models import blob as blob_model
+from .models import upload_session as upload_session_model
+from .models import document_content as document_content_model
+from .models import document_version as document_version_model
+
+# Register the listeners that keep dashboard_counters in sync
+from .core import counters
+# Register the listeners that keep blob reference counts in sync
+from .core import blobs
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -71,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, UPLOAD_OFFSET, UPLOAD_LENGTH, "Location", "ETag"],
 )
 
 # Include routers
@@ -114,3 +129,9 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    """Hit/miss counters of the record cache, for tuning its size and TTL"""
+    return entity_cache.stats()
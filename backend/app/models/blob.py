@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Content Address
+    sha256 = Column(String(64), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False, default=0)  # in bytes
+
+    # Number of live documents pointing at this content
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
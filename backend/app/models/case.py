@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -15,6 +15,8 @@ class Case(Base):
     middle_name = Column(String(100), nullable=True)
     last_name = Column(String(100), nullable=False)
     photo_url = Column(String(500), nullable=True)
+    photo_key = Column(String(1000), nullable=True)  # Storage key of an uploaded photo
+    has_thumbnail = Column(Boolean, nullable=True)  # None until thumbnails are rendered
     gender = Column(String(20), nullable=True)
     date_of_birth = Column(Date, nullable=True)
     date_of_death = Column(Date, nullable=False)
@@ -32,5 +34,9 @@ class Case(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @property
+    def thumbnail_url(self):
+        return f"/api/cases/{self.id}/photo/thumbnail" if self.has_thumbnail else None
+
     # Relationships
     venue_bookings = relationship("VenueBooking", back_populates="case")
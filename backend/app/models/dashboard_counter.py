@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+    __table_args__ = (
+        UniqueConstraint("entity", "branch", "status", "bucket", name="uq_dashboard_counters_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Counter Key
+    entity = Column(String(50), nullable=False)  # invoices, payments, expenses, transactions, tasks, followups, families
+    branch = Column(String(100), nullable=False, default="")
+    status = Column(String(50), nullable=False, default="")
+    bucket = Column(String(20), nullable=False, default="")  # ISO due date for open invoices, empty otherwise
+
+    # Aggregates
+    row_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    balance = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
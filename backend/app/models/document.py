@@ -1,11 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, BigInteger, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, BigInteger, ForeignKey, Index
+from sqlalchemy.sql import func, column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
+LIVE_ROWS = column("is_deleted", Boolean) == False
+
 
 class Document(Base):
     __tablename__ = "documents"
+    # List queries only ever see live rows, so the indexes skip soft-deleted ones
+    __table_args__ = (
+        Index("ix_documents_live_created_at", "created_at", "id", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        Index("ix_documents_live_document_type_created_at", "document_type", "created_at", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        Index("ix_documents_live_case_id", "case_id", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -20,6 +28,11 @@ class Document(Base):
     file_size = Column(BigInteger, nullable=False)  # in bytes
     file_type = Column(String(100), nullable=False)  # PDF, DOCX, etc.
     mime_type = Column(String(200), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the file bytes
+    has_thumbnail = Column(Boolean, nullable=True)  # None until thumbnails are rendered
+
+    # Versioning: the file fields above always describe this version
+    current_version = Column(Integer, nullable=True)  # version_number in document_versions
 
     # Association
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=True)
@@ -41,6 +54,11 @@ class Document(Base):
 
     # Soft Delete
     is_deleted = Column(Boolean, default=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def thumbnail_url(self):
+        return f"/api/documents/{self.id}/thumbnail" if self.has_thumbnail else None
 
     # Relationships
     case = relationship("Case", backref="documents", foreign_keys=[case_id])
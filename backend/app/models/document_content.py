@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class DocumentContent(Base):
+    """Text extracted from a stored file, shared by every document with that content"""
+    __tablename__ = "document_contents"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Content Address (Document.content_hash)
+    content_hash = Column(String(64), nullable=False, unique=True)
+
+    # Extracted Text; empty when the file holds none (e.g. a scanned PDF)
+    text = Column(Text, nullable=False, default="")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class DocumentVersion(Base):
+    __tablename__ = "document_versions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "version_number", name="uq_document_versions_document_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    version_number = Column(Integer, nullable=False)  # 1, 2, ... per document
+
+    # File Information
+    file_name = Column(String(500), nullable=False)
+    file_path = Column(String(1000), nullable=False)
+    file_size = Column(BigInteger, nullable=False)  # in bytes
+    file_type = Column(String(100), nullable=False)
+    mime_type = Column(String(200), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the file bytes
+
+    # Delta Storage: superseded text-like versions are kept as a delta
+    # against the version that replaced them instead of as a whole file
+    delta_key = Column(String(1000), nullable=True)
+    delta_base = Column(Integer, nullable=True)  # version_number the delta applies to
+
+    # Revision Details
+    comment = Column(String(1000), nullable=True)
+    uploaded_by = Column(String(200), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    superseded_at = Column(DateTime(timezone=True), nullable=True)  # None for the current version
+
+    @property
+    def stored_as_delta(self):
+        return self.delta_key is not None
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 class Followup(Base):
     __tablename__ = "followups"
+    __table_args__ = (
+        Index("ix_followups_status_due_date", "status", "due_date"),
+        Index("ix_followups_due_date", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     family_id = Column(Integer, nullable=True)
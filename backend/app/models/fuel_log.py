@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class FuelLog(Base):
     __tablename__ = "fuel_logs"
+    __table_args__ = (
+        Index("ix_fuel_logs_date_id", "date", "id"),
+        Index("ix_fuel_logs_vehicle_id_date", "vehicle_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
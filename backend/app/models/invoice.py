@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("ix_invoices_created_at_id", "created_at", "id"),
+        Index("ix_invoices_status_created_at", "status", "created_at"),
+        Index("ix_invoices_branch_created_at", "branch", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String(100), unique=True, nullable=False)
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_created_at_id", "created_at", "id"),
+        Index("ix_payments_status_created_at", "status", "created_at"),
+        Index("ix_payments_payment_method_created_at", "payment_method", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     payment_number = Column(String(100), unique=True, nullable=False)
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Date, Time, Boolean, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Schedule(Base):
     __tablename__ = "staff_schedules"
+    __table_args__ = (
+        Index("ix_staff_schedules_shift_date_id", "shift_date", "id"),
+        Index("ix_staff_schedules_staff_member_id_shift_date", "staff_member_id", "shift_date"),
+        Index("ix_staff_schedules_status_shift_date", "status", "shift_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Sequence(Base):
+    __tablename__ = "sequences"
+    __table_args__ = (
+        UniqueConstraint("name", "period", name="uq_sequences_name_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Sequence Key
+    name = Column(String(50), nullable=False)  # payments, transactions, families, expenses, stock_movements, purchase_orders, cases
+    period = Column(String(10), nullable=False, default="")  # year for yearly sequences, empty otherwise
+
+    # Last number handed out
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
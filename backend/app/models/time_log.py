@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class TimeLog(Base):
     __tablename__ = "time_logs"
+    __table_args__ = (
+        Index("ix_time_logs_log_date_id", "log_date", "id"),
+        Index("ix_time_logs_staff_member_id_log_date", "staff_member_id", "log_date"),
+        Index("ix_time_logs_status_log_date", "status", "log_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
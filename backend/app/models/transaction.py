@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_transaction_date_id", "transaction_date", "id"),
+        Index("ix_transactions_type_transaction_date", "transaction_type", "transaction_date"),
+        Index("ix_transactions_category_transaction_date", "category", "transaction_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     transaction_id = Column(String(100), unique=True, nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, JSON, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String(64), nullable=False, unique=True)
+
+    # File being uploaded
+    file_name = Column(String(500), nullable=False)
+    mime_type = Column(String(200), nullable=True)
+    file_size = Column(BigInteger, nullable=False)  # declared total, in bytes
+    upload_offset = Column(BigInteger, nullable=False, default=0)  # bytes received so far
+
+    # Fields of the Document created once the upload completes
+    document_fields = Column(JSON, nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
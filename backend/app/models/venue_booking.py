@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class VenueBooking(Base):
     __tablename__ = "venue_bookings"
+    __table_args__ = (
+        Index("ix_venue_bookings_case_id", "case_id"),
+        Index("ix_venue_bookings_booking_date_id", "booking_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), nullable=False)
@@ -47,6 +47,7 @@ class CaseUpdate(BaseModel):
 class CaseResponse(CaseBase):
     id: int
     case_number: str
+    thumbnail_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -40,6 +40,10 @@ class DocumentUpdate(BaseModel):
 
 class DocumentResponse(DocumentBase):
     id: int
+    content_hash: Optional[str] = None
+    current_version: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    snippet: Optional[str] = None  # Passage matching content_search, matches wrapped in <mark>
     created_at: datetime
     updated_at: Optional[datetime] = None
 
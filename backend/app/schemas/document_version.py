@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class DocumentVersionResponse(BaseModel):
+    id: Optional[int] = None  # None for documents uploaded before versioning
+    document_id: int
+    version_number: int
+    file_name: str
+    file_size: int
+    file_type: str
+    mime_type: Optional[str] = None
+    content_hash: Optional[str] = None
+    stored_as_delta: bool = False
+    comment: Optional[str] = None
+    uploaded_by: Optional[str] = None
+    created_at: datetime
+    superseded_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -14,7 +14,6 @@ class PreneedBase(BaseModel):
     amount_paid: float = 0.0
     payment_plan: str
     status: str = "Active"
-    contract_document: Optional[str] = None
     special_instructions: Optional[str] = None
     notes: Optional[str] = None
 
@@ -33,12 +32,13 @@ class PreneedUpdate(BaseModel):
     amount_paid: Optional[float] = None
     payment_plan: Optional[str] = None
     status: Optional[str] = None
-    contract_document: Optional[str] = None
     special_instructions: Optional[str] = None
     notes: Optional[str] = None
 
 class PreneedResponse(PreneedBase):
     id: int
+    # Set by POST /preneeds/{id}/contract only
+    contract_document: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
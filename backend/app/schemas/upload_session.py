@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class UploadSessionCreate(BaseModel):
+    # File
+    file_name: str
+    file_size: int = Field(..., gt=0)
+    mime_type: Optional[str] = None
+
+    # Document
+    title: str
+    document_type: str
+    description: Optional[str] = None
+    case_id: Optional[int] = None
+    client_name: Optional[str] = None
+    status: Optional[str] = "Draft"
+    visibility: Optional[str] = "Private"
+    tags: Optional[str] = None
+    uploaded_by: Optional[str] = None
+
+
+class UploadSessionResponse(BaseModel):
+    token: str
+    file_name: str
+    file_size: int
+    upload_offset: int
+    document_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
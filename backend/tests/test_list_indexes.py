@@ -0,0 +1,168 @@
+"""The main list queries are served by the indexes added for them.
+
+Runs only against PostgreSQL. Point ``DATABASE_URL`` at a PostgreSQL database
+and run ``python -m pytest tests``. Missing tables and indexes are created,
+and the tables filled with generated rows and analyzed, inside a transaction
+that is rolled back, so the database is left as it was.
+
+Each list endpoint is called with the session under test, and every SELECT it
+runs is explained. Sequential scans are switched off for the plans, so a
+table that happens to be small cannot hide a missing index; the planner still
+chooses between the indexes, and the test asserts it picks the new one.
+"""
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+pytestmark = pytest.mark.skipif(
+    make_url(settings.DATABASE_URL).get_backend_name() != "postgresql",
+    reason="index scans are checked on PostgreSQL only",
+)
+
+from app.api import documents, invoices, payments, transactions  # noqa: E402
+from app.core.database import AsyncDB, Base, engine  # noqa: E402
+from app.core.pagination import Pagination, _Explain  # noqa: E402
+from app.core.rendering import Renderer, _sample_rows  # noqa: E402
+from app.core.schema import load_models  # noqa: E402
+
+LISTS = {
+    "invoices": lambda db, page, status=None, branch=None: asyncio.run(invoices.get_invoices(
+        page=page, search=None, status=status, branch=branch, render=_render(), db=AsyncDB(db)
+    )),
+    "payments": lambda db, page, status=None, payment_method=None: asyncio.run(payments.get_payments(
+        page=page, search=None, status=status, payment_method=payment_method, db=AsyncDB(db)
+    )),
+    "transactions": lambda db, page, transaction_type=None, category=None: transactions.get_transactions(
+        page=page, search=None, transaction_type=transaction_type, category=category, db=db
+    ),
+    "documents": lambda db, page, document_type=None: documents.get_documents(
+        page=page, search=None, content_search=None, document_type=document_type, status=None,
+        visibility=None, render=_render(), db=db
+    ),
+}
+
+# (list, filters, index expected to serve it)
+CASES = [
+    ("invoices", {}, "ix_invoices_created_at_id"),
+    ("invoices", {"status": "Paid"}, "ix_invoices_status_created_at"),
+    ("invoices", {"branch": "North"}, "ix_invoices_branch_created_at"),
+    ("payments", {}, "ix_payments_created_at_id"),
+    ("payments", {"status": "Completed"}, "ix_payments_status_created_at"),
+    ("payments", {"payment_method": "Card"}, "ix_payments_payment_method_created_at"),
+    ("transactions", {}, "ix_transactions_transaction_date_id"),
+    ("transactions", {"transaction_type": "Income"}, "ix_transactions_type_transaction_date"),
+    ("transactions", {"category": "Services"}, "ix_transactions_category_transaction_date"),
+    ("documents", {}, "ix_documents_live_created_at"),
+    ("documents", {"document_type": "Contract"}, "ix_documents_live_document_type_created_at"),
+]
+
+
+ROWS = 5000
+# Distinct values of each filtered column, so a filter matches a tenth of the rows
+FILTER_VALUES = 10
+
+
+def _rows(table, filters: dict) -> list:
+    """Generated rows for ``table``, newest first, cycling each filtered column through a few values"""
+    model = next(mapper.class_ for mapper in Base.registry.mappers if mapper.local_table is table)
+    rows = []
+    for number, row in enumerate(_sample_rows(model, ROWS)):
+        # References to other tables are left empty
+        values = {
+            column.key: None if column.foreign_keys else getattr(row, column.key, None)
+            for column in table.columns if column.key != "id"
+        }
+        for name, value in values.items():
+            if isinstance(value, datetime):
+                values[name] = value - timedelta(minutes=number)
+            elif isinstance(value, date):
+                values[name] = value - timedelta(days=number % 730)
+        for name, choices in filters.items():
+            values[name] = choices[number % len(choices)]
+        rows.append(values)
+    return rows
+
+
+def _render() -> Renderer:
+    return Renderer(Request({"type": "http", "method": "GET", "headers": []}), Response())
+
+
+def _page(cursor) -> Pagination:
+    return Pagination(Response(), skip=0, limit=100, cursor=cursor, count=None)
+
+
+def _index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def _indexes_used(db: Session, call) -> set:
+    """Names of the indexes in the plans of every SELECT ``call`` runs"""
+    statements = []
+
+    def record(orm_execute_state):
+        if orm_execute_state.is_select:
+            statements.append((orm_execute_state.statement, orm_execute_state.parameters))
+
+    event.listen(db, "do_orm_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(db, "do_orm_execute", record)
+
+    assert statements, "the list ran no query"
+    used = set()
+    for statement, parameters in statements:
+        plan = db.execute(_Explain(statement), parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        used |= _index_names(plan[0]["Plan"])
+    return used
+
+
+@pytest.fixture(scope="module")
+def db():
+    load_models()
+    tables = [Base.metadata.tables[name] for name in LISTS]
+    expected = {index for _, _, index in CASES}
+    connection = engine.connect()
+    transaction = connection.begin()
+    try:
+        missing = [table for table in tables if not inspect(connection).has_table(table.name)]
+        if missing:
+            Base.metadata.create_all(connection, tables=missing)
+        for table in tables:
+            for index in table.indexes:
+                if index.name in expected:
+                    index.create(connection, checkfirst=True)
+            filters = {}
+            for list_name, list_filters, _ in CASES:
+                for name, value in list_filters.items():
+                    if list_name == table.name:
+                        filters[name] = [value] + [f"{value} {n}" for n in range(1, FILTER_VALUES)]
+            connection.execute(table.insert(), _rows(table, filters))
+            connection.exec_driver_sql(f"ANALYZE {table.name}")
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        session = Session(bind=connection)
+        yield session
+        session.close()
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.mark.parametrize("cursor", [None, ""], ids=["offset", "keyset"])
+@pytest.mark.parametrize("list_name, filters, index", CASES, ids=[index for _, _, index in CASES])
+def test_list_uses_index(db, list_name, filters, index, cursor):
+    used = _indexes_used(db, lambda: LISTS[list_name](db, _page(cursor), **filters))
+    assert index in used, f"{list_name} {filters} used {sorted(used) or 'no index'}"
@@ -345,7 +345,7 @@ export default function DocumentsPage() {
                           <div className="flex items-center gap-2">
                             <button
                               title="Download"
-                              onClick={() => window.open(doc.file_path, '_blank')}
+                              onClick={() => window.open(documentsApi.getDownloadUrl(doc.id!), '_blank')}
                               className="p-2 hover:bg-blue-50 rounded-lg transition-colors"
                             >
                               <svg className="w-5 h-5 text-blue-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
@@ -44,13 +44,17 @@ export default function NewCaseModal({ isOpen, onClose, onCaseCreated }: NewCase
     setSubmitting(true);
 
     try {
-      await casesApi.create(formData as CaseData);
+      const created = await casesApi.create(formData as CaseData);
+      if (photoFile && created.id) {
+        await casesApi.uploadPhoto(created.id, photoFile);
+      }
       alert('Case created successfully!');
       setFormData({
         gender: 'Unknown',
         priority: 'Normal',
         status: 'Intake',
       });
+      setPhotoFile(null);
       onCaseCreated?.();
       onClose();
     } catch (error) {
@@ -10,6 +10,7 @@ export interface CaseData {
   middle_name?: string;
   last_name: string;
   photo_url?: string;
+  thumbnail_url?: string;
   gender?: string;
   date_of_birth?: string;
   date_of_death: string;
@@ -48,4 +49,15 @@ export const casesApi = {
   delete: async (id: number): Promise<void> => {
     await axios.delete(`${API_URL}/${id}`);
   },
+
+  uploadPhoto: async (id: number, file: File): Promise<CaseData> => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await axios.post(`${API_URL}/${id}/photo`, formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    });
+    return response.data;
+  },
 };
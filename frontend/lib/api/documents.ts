@@ -20,6 +20,7 @@ export interface DocumentData {
   tags?: string;
   uploaded_by?: string;
   is_deleted?: boolean;
+  thumbnail_url?: string;
   created_at?: string;
   updated_at?: string;
 }
@@ -99,8 +100,7 @@ export const documentsApi = {
     await axios.delete(`${API_URL}/${id}`);
   },
 
-  getDownloadUrl: async (id: number): Promise<{ file_path: string; file_name: string; mime_type: string }> => {
-    const response = await axios.get(`${API_URL}/${id}/download`);
-    return response.data;
+  getDownloadUrl: (id: number, inline: boolean = false): string => {
+    return `${API_URL}/${id}/download${inline ? '?inline=true' : ''}`;
   },
 };